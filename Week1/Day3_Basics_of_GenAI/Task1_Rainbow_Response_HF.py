@@ -1,7 +1,13 @@
-from transformers import pipeline, set_seed
+import sys
+from pathlib import Path
 
-# Create a text generation pipeline using a model like GPT-2
-generator = pipeline('text-generation', model='gpt2')
+from transformers import set_seed
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import get_pipeline
+
+# Create a text generation pipeline using a model like GPT-2 (MODEL_BACKEND=int8|onnx for a faster CPU model)
+generator = get_pipeline('text-generation', 'gpt2')
 
 # Set a seed for reproducibility (optional)
 set_seed(42)
@@ -1,9 +1,13 @@
 # ocean_poem.py
-from transformers import pipeline
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import get_pipeline
 
 def main():
-    # Load a text-generation pipeline with a small model
-    generator = pipeline("text-generation", model="gpt2")
+    # Load a text-generation pipeline with a small model (MODEL_BACKEND=int8|onnx for a faster CPU model)
+    generator = get_pipeline("text-generation", "gpt2")
 
     prompt = "Write a small poem about the ocean"
 
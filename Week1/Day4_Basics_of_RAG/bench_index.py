@@ -0,0 +1,89 @@
+# bench_index.py
+# Recall-vs-latency benchmark for the FAISS index modes in index_modes.py.
+# Builds every mode over a synthetic clustered corpus and reports build time,
+# serialized index size, p50/p99 single-query latency and recall@k against the
+# exact (flat) results.
+#
+# Usage: python bench_index.py --sizes 10000 100000 1000000 --dim 384 --k 10
+#        python bench_index.py --modes flat ivf_flat --set ivf_flat.nprobe=64
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from index_modes import INDEX_MODES, build_index, index_size
+
+
+def synthetic_vectors(n, dim, n_clusters=256, seed=0):
+    """Gaussian clusters, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100000):
+        stop = min(n, start + 100000)
+        out[start:stop] = centers[labels[start:stop]] + 0.5 * rng.standard_normal((stop - start, dim), dtype=np.float32)
+    return out
+
+
+def run(n, dim, n_queries, k, modes, overrides=None):
+    data = synthetic_vectors(n, dim)
+    queries = synthetic_vectors(n_queries, dim, seed=1)
+    exact = None
+    rows = []
+    for mode in ["flat"] + [m for m in modes if m != "flat"]:
+        start = time.perf_counter()
+        index = build_index(mode, data, **(overrides or {}).get(mode, {}))
+        build_s = time.perf_counter() - start
+        latencies = np.empty(n_queries)
+        found = np.empty((n_queries, k), dtype=np.int64)
+        for i in range(n_queries):
+            t = time.perf_counter()
+            found[i] = index.search(queries[i:i + 1], k)[1][0]
+            latencies[i] = (time.perf_counter() - t) * 1000
+        if exact is None:
+            exact = found
+        recall = np.mean([len(np.intersect1d(a, b)) / k for a, b in zip(found, exact)])
+        if mode in modes:
+            rows.append({
+                "n": n, "mode": mode, "build_s": round(build_s, 3),
+                "size_mb": round(index_size(index) / 2**20, 2),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+                f"recall@{k}": round(float(recall), 4),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index modes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 produces 384-d vectors")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=sorted(INDEX_MODES), default=list(INDEX_MODES))
+    parser.add_argument("--set", nargs="*", default=[], metavar="MODE.PARAM=VALUE",
+                        help="override index parameters, e.g. ivf_pq.m=32 hnsw.ef_search=128")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.set:
+        key, value = item.split("=", 1)
+        mode, param = key.split(".", 1)
+        overrides.setdefault(mode, {})[param] = int(value)
+
+    results = []
+    for n in args.sizes:
+        for row in run(n, args.dim, args.queries, args.k, args.modes, overrides):
+            results.append(row)
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
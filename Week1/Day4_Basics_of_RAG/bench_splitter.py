@@ -0,0 +1,97 @@
+# bench_splitter.py
+# Throughput (MB/s) and peak memory of RecursiveCharacterTextSplitter vs the streaming
+# SpanSplitter on a synthetic policy dump, plus a check that both give the same chunks.
+#
+# Usage: python bench_splitter.py --mb 50 --chunk-size 300 --chunk-overlap 50
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from policy import CHUNK_OVERLAP, CHUNK_SIZE
+from stream_splitter import MappedText, SpanSplitter
+
+WORDS = ("refund policy employee leave days manager approval within product unused customer "
+         "request submit form holiday salary notice period benefits insurance travel claim").split()
+
+
+def write_corpus(path, mb, seed=0):
+    """Paragraphs of 1-12 lines of 4-30 words, with the odd very long unbroken token."""
+    rng = random.Random(seed)
+    target = mb * 2**20
+    with open(path, "w", encoding="ascii") as f:
+        written = 0
+        while written < target:
+            lines = []
+            for _ in range(rng.randint(1, 12)):
+                words = rng.choices(WORDS, k=rng.randint(4, 30))
+                if rng.random() < 0.01:
+                    words.append("x" * rng.randint(200, 2000))
+                lines.append(" ".join(words))
+            block = "\n".join(lines) + "\n\n"
+            f.write(block)
+            written += len(block)
+
+
+def langchain_chunks(path, size, overlap):
+    with open(path, encoding="utf-8") as f:
+        return RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap).split_text(f.read())
+
+
+def span_count(path, size, overlap):
+    with MappedText(path) as text:
+        return sum(1 for _ in SpanSplitter(size, overlap).spans(text.buffer))
+
+
+def span_chunks(path, size, overlap):
+    with MappedText(path) as text:
+        return list(SpanSplitter(size, overlap).chunks(text))
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming vs LangChain text splitting.")
+    parser.add_argument("--mb", type=int, default=20, help="synthetic corpus size in MB (default: 20)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--file", help="benchmark this file instead of a synthetic corpus")
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.file
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".txt", delete=False)
+        tmp.close()
+        path = tmp.name
+        write_corpus(path, args.mb)
+    try:
+        mb = os.path.getsize(path) / 2**20
+        reference = langchain_chunks(path, args.chunk_size, args.chunk_overlap)
+        streamed = span_chunks(path, args.chunk_size, args.chunk_overlap)
+        print(f"{mb:.1f} MB, {len(reference)} chunks, identical boundaries: {streamed == reference}")
+        del reference, streamed
+        for name, fn in [("langchain", langchain_chunks), ("spans", span_count), ("spans+text", span_chunks)]:
+            seconds, peak = measure(fn, path, args.chunk_size, args.chunk_overlap)
+            print(f"{name:>10}: {mb / seconds:7.1f} MB/s  peak {peak / 2**20:8.1f} MB")
+    finally:
+        if tmp is not None:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# bulk_ingest.py
+# Bulk ingestion for large policy corpora:
+#   1. stream *.txt files from a directory and chunk them (mmap + spans) in worker processes
+#   2. embed the chunks in length-sorted batches (less padding per batch), through policy.py's
+#      embedding cache so later incremental updates reuse the vectors
+#   3. write vectors straight into a memory-mapped float32 .npy matrix
+#   4. build the FAISS index (any mode from index_modes.py) from that matrix and save it where
+#      policy.py expects it, with a compatible manifest for incremental updates
+#
+# Usage: python bulk_ingest.py policies/ --batch-size 128 --workers 8
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.vectorstores import FAISS
+
+from index_modes import INDEX_MODES, build_index
+from policy import CHUNK_OVERLAP, CHUNK_SIZE, INDEX_DIR, MANIFEST, chunk_id, file_hash, get_embedding
+from stream_splitter import MappedText, SpanSplitter
+
+ADD_BLOCK = 65536   # rows copied from the memmap into FAISS at a time
+
+
+def iter_files(root):
+    for path in sorted(Path(root).rglob("*.txt")):
+        yield str(path)
+
+
+def chunk_file(path):
+    """Worker: map and split one file. Returns (path, sha256, chunk texts)."""
+    with MappedText(path) as text:
+        chunks = list(SpanSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP).chunks(text))
+    return path, file_hash(path), chunks
+
+
+def embed_to_memmap(texts, encode, dim, out_path, batch_size=64):
+    """Embed ``texts`` in length-sorted batches into a float32 (len(texts), dim) .npy memmap."""
+    vectors = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(len(texts), dim))
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        vectors[rows] = encode([texts[i] for i in rows])
+    vectors.flush()
+    return vectors
+
+
+def build_faiss(vectors, texts, metadatas, ids, embedding, mode="flat"):
+    if mode == "flat":
+        import faiss
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        for start in range(0, len(vectors), ADD_BLOCK):
+            index.add(np.ascontiguousarray(vectors[start:start + ADD_BLOCK]))
+    else:
+        index = build_index(mode, vectors)
+    docstore = InMemoryDocstore({i: Document(page_content=t, metadata=m) for i, t, m in zip(ids, texts, metadatas)})
+    return FAISS(embedding, index, docstore, dict(enumerate(ids)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of policy files into a FAISS index.")
+    parser.add_argument("root", help="directory searched recursively for *.txt files")
+    parser.add_argument("--batch-size", type=int, default=64, help="texts per embedding batch (default: 64)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="chunking processes (default: CPU count)")
+    parser.add_argument("--index-mode", choices=sorted(INDEX_MODES), default="flat", help="FAISS index type (default: flat)")
+    parser.add_argument("--vectors", default="vectors.npy", help="memory-mapped output matrix (default: vectors.npy)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    texts, metadatas, ids, manifest = [], [], [], {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, digest, chunks in pool.map(chunk_file, iter_files(args.root), chunksize=16):
+            file_ids = [chunk_id(path, i, t) for i, t in enumerate(chunks)]
+            texts += chunks; ids += file_ids
+            metadatas += [{"source": path}] * len(chunks)
+            manifest[path] = {"sha256": digest, "ids": file_ids}
+    chunked = time.perf_counter()
+    n_docs = len(manifest)
+    print(f"Chunked {n_docs} docs into {len(texts)} chunks in {chunked - start:.1f}s "
+          f"({n_docs / (chunked - start):.1f} docs/s)")
+    if not texts:
+        raise SystemExit("No chunks to embed")
+
+    # policy.py's cache-backed embedder: cached chunks are skipped, and new vectors are stored in
+    # embedding_cache/ for later incremental updates and rebuilds.
+    embedding = get_embedding()
+    base = embedding.underlying_embeddings
+    base.encode_kwargs = {**base.encode_kwargs, "batch_size": args.batch_size}
+    vectors = embed_to_memmap(
+        texts,
+        lambda batch: np.asarray(embedding.embed_documents(batch), dtype=np.float32),
+        base.client.get_sentence_embedding_dimension(),
+        args.vectors,
+        args.batch_size,
+    )
+    embedded = time.perf_counter()
+    print(f"Embedded {len(texts)} chunks in {embedded - chunked:.1f}s ({len(texts) / (embedded - chunked):.1f} chunks/s)")
+
+    db = build_faiss(vectors, texts, metadatas, ids, embedding, args.index_mode)
+    db.save_local(INDEX_DIR)
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    total = time.perf_counter() - start
+    print(f"Saved {db.index.ntotal} vectors to {INDEX_DIR} in {total:.1f}s total "
+          f"({n_docs / total:.1f} docs/s, {len(texts) / total:.1f} chunks/s)")
+
+
+if __name__ == "__main__":
+    main()
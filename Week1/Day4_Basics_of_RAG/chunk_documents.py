@@ -30,3 +30,12 @@ chunks = splitter.split_documents(documents)
 
 # Step 4: Print the number of chunks
 print(f"Total number of document chunks: {len(chunks)}")
+
+# Step 5: Same boundaries without loading the file into a Document: the streaming splitter
+# scans an mmap of sample.txt and yields (offset, length) spans, slicing text only on demand
+from stream_splitter import MappedText, SpanSplitter
+
+with MappedText("sample.txt") as text:
+    spans = list(SpanSplitter(chunk_size=100, chunk_overlap=20).spans(text.buffer))
+    assert [text.text(o, n) for o, n in spans] == [c.page_content for c in chunks]
+print(f"Streamed spans: {spans}")
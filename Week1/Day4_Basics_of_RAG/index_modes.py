@@ -0,0 +1,86 @@
+# index_modes.py
+# Selectable FAISS index types for the policy retriever:
+#   flat      exact brute force (LangChain's default)
+#   ivf_flat  inverted lists over k-means cells, full vectors, probes nprobe cells
+#   ivf_pq    inverted lists with product-quantized codes (m bytes per vector)
+#   hnsw      graph search, no training
+# All use L2 distance, so they are drop-in replacements inside LangChain's FAISS store.
+
+import math
+
+import faiss
+import numpy as np
+
+INDEX_MODES = {
+    "flat": {},
+    "ivf_flat": {"nlist": None, "nprobe": 16},
+    "ivf_pq": {"nlist": None, "nprobe": 16, "m": 48, "nbits": 8},
+    "hnsw": {"M": 32, "ef_construction": 80, "ef_search": 64},
+}
+
+
+def _nlist(n, nlist):
+    # ~4 * sqrt(n) cells, keeping at least 39 training points per cell as FAISS recommends.
+    if nlist is None:
+        nlist = int(4 * math.sqrt(n))
+    return max(1, min(nlist, n // 39))
+
+
+def build_index(mode, vectors, **params):
+    """Create, train and fill an index of ``mode`` from a float32 (n, dim) matrix."""
+    if mode not in INDEX_MODES:
+        raise ValueError(f"Unknown index mode {mode!r}; expected one of {sorted(INDEX_MODES)}")
+    p = {**INDEX_MODES[mode], **params}
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    if mode == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif mode == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, p["M"])
+        index.hnsw.efConstruction = p["ef_construction"]
+    else:
+        quantizer = faiss.IndexFlatL2(dim)
+        nlist = _nlist(n, p["nlist"])
+        if mode == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            if dim % p["m"]:
+                raise ValueError(f"ivf_pq: m={p['m']} must divide the vector dimension {dim}")
+            if n < 2 ** p["nbits"]:
+                raise ValueError(f"ivf_pq: need at least {2 ** p['nbits']} vectors to train, got {n}")
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, p["m"], p["nbits"])
+        index.train(vectors)
+    index.add(vectors)
+    set_search_params(index, nprobe=p.get("nprobe"), ef_search=p.get("ef_search"))
+    return index
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """Apply query-time knobs; FAISS does not persist them with the index."""
+    if nprobe is not None and hasattr(index, "nprobe"):
+        index.nprobe = nprobe
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+
+
+def index_mode(index):
+    """The INDEX_MODES name of a built (or loaded) index."""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf_flat"
+    return "flat"
+
+
+def supports_remove(index):
+    """Whether LangChain's ``FAISS.delete`` is safe on ``index``. It renumbers the remaining ids
+    on the assumption that remove_ids shifts later vectors down, which only IndexFlat does: IVF
+    lists keep their ids (the docstore mapping goes stale) and HNSW graphs raise."""
+    return isinstance(index, faiss.IndexFlat)
+
+
+def index_size(index):
+    """Serialized size in bytes."""
+    return int(faiss.serialize_index(index).nbytes)
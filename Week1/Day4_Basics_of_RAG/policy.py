@@ -1,34 +1,149 @@
-from langchain.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.vectorstores import FAISS
-from langchain.embeddings import SentenceTransformerEmbeddings
-from langchain.chains import RetrievalQA
-from langchain.llms.fake import FakeListLLM
-
-# Step 1: Load document
-loader = TextLoader("company_policy.txt")
-documents = loader.load()
-
-# Step 2: Split document into chunks
-splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
-docs = splitter.split_documents(documents)
-
-# Step 3: Embed chunks using sentence-transformers
-embedding = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-
-# Step 4: Store in FAISS vector store
-db = FAISS.from_documents(docs, embedding)
-
-# Step 5: Setup Retriever
-retriever = db.as_retriever()
-
-# Step 6: Use a Fake LLM for demo (or plug in OpenAI/Local model)
-# Replace this with an actual LLM if needed
-llm = FakeListLLM(responses=["You can get a refund within 30 days if the product is unused."])
-qa = RetrievalQA.from_chain_type(llm=llm, retriever=retriever)
-
-# Step 7: Ask your question
-query = "What is the refund policy?"
-answer = qa.run(query)
-
-print(f"Q: {query}\nA: {answer}")
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.vectorstores import FAISS
+from langchain.embeddings import CacheBackedEmbeddings, SentenceTransformerEmbeddings
+from langchain.storage import LocalFileStore
+from langchain.chains import RetrievalQA
+from langchain.llms.fake import FakeListLLM
+
+from index_modes import build_index, index_mode, set_search_params, supports_remove
+from stream_splitter import MappedText, SpanSplitter
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+INDEX_DIR = "policy_index"          # FAISS index + docstore (save_local)
+CACHE_DIR = "embedding_cache"       # content-hash -> embedding
+MANIFEST = os.path.join(INDEX_DIR, "manifest.json")
+CHUNK_SIZE = 300
+CHUNK_OVERLAP = 50
+NPROBE = 16                         # IVF cells searched per query (ivf_* indexes)
+EF_SEARCH = 64                      # HNSW search breadth (hnsw indexes)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_embedding():
+    # Embeddings are cached on disk keyed by a hash of the chunk text, so a chunk
+    # is only ever embedded once, even if its file is re-ingested.
+    base = SentenceTransformerEmbeddings(model_name=MODEL_NAME)
+    return CacheBackedEmbeddings.from_bytes_store(base, LocalFileStore(CACHE_DIR), namespace=MODEL_NAME)
+
+
+def chunk_id(path, i, text):
+    return f"{path}:{i}:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+def split_file(path, splitter):
+    # Same chunks as RecursiveCharacterTextSplitter over TextLoader, but the file is scanned
+    # through an mmap and only the chunk strings themselves are ever built.
+    with MappedText(path) as text:
+        docs = [Document(page_content=chunk, metadata={"source": path}) for chunk in splitter.chunks(text)]
+    return docs, [chunk_id(path, i, d.page_content) for i, d in enumerate(docs)]
+
+
+def load_manifest():
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def rebuild_index(paths, embedding, splitter, mode):
+    """A fresh ``mode`` index over every file; unchanged chunks come from the embedding cache."""
+    docs, ids = [], []
+    for path in paths:
+        file_docs, file_ids = split_file(path, splitter)
+        docs += file_docs; ids += file_ids
+    vectors = np.asarray(embedding.embed_documents([d.page_content for d in docs]), dtype=np.float32)
+    index = build_index(mode, vectors)
+    set_search_params(index, nprobe=NPROBE, ef_search=EF_SEARCH)
+    return FAISS(embedding, index, InMemoryDocstore(dict(zip(ids, docs))), dict(enumerate(ids))), len(docs)
+
+
+def build_or_update_index(paths, embedding, splitter):
+    """Load the saved index and re-ingest only files that were added, changed or removed.
+
+    Only flat indexes delete chunks in place; the other modes (e.g. from ``bulk_ingest.py
+    --index-mode hnsw``) are rebuilt in the same mode whenever a chunk has to be removed.
+    """
+    manifest = load_manifest()
+    db = None
+    if manifest and os.path.exists(os.path.join(INDEX_DIR, "index.faiss")):
+        db = FAISS.load_local(INDEX_DIR, embedding, allow_dangerous_deserialization=True)
+        set_search_params(db.index, nprobe=NPROBE, ef_search=EF_SEARCH)
+    else:
+        manifest = {}
+
+    stale_ids, new_docs, new_ids = [], [], []
+    for path in set(manifest) - set(paths):
+        stale_ids += manifest.pop(path)["ids"]
+    for path in paths:
+        digest = file_hash(path)
+        entry = manifest.get(path)
+        if entry and entry["sha256"] == digest:
+            continue
+        if entry:
+            stale_ids += entry["ids"]
+        docs, ids = split_file(path, splitter)
+        new_docs += docs; new_ids += ids
+        manifest[path] = {"sha256": digest, "ids": ids}
+
+    if not stale_ids and not new_docs and db is not None:
+        print(f"Index up to date ({INDEX_DIR})")
+        return db
+    if db is None and not new_docs:
+        raise ValueError("No policy documents to index")
+    if db is not None and stale_ids and not supports_remove(db.index):
+        mode = index_mode(db.index)
+        db, total = rebuild_index(paths, embedding, splitter, mode)
+        print(f"Rebuilt the {mode} index with {total} chunks ({len(new_docs)} new, {len(stale_ids)} stale removed)")
+    else:
+        if db is not None and stale_ids:
+            db.delete(stale_ids)
+        if new_docs:
+            if db is None:
+                db = FAISS.from_documents(new_docs, embedding, ids=new_ids)
+            else:
+                db.add_documents(new_docs, ids=new_ids)
+        print(f"Re-ingested {len(new_docs)} chunks, removed {len(stale_ids)} stale chunks")
+    db.save_local(INDEX_DIR)
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return db
+
+
+def main():
+    paths = sys.argv[1:] or ["company_policy.txt"]
+
+    # Step 1-4: Load, split, embed (cached) and store in a persisted FAISS index
+    splitter = SpanSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    db = build_or_update_index(paths, get_embedding(), splitter)
+
+    # Step 5: Setup Retriever
+    retriever = db.as_retriever()
+
+    # Step 6: Use a Fake LLM for demo (or plug in OpenAI/Local model)
+    # Replace this with an actual LLM if needed
+    llm = FakeListLLM(responses=["You can get a refund within 30 days if the product is unused."])
+    qa = RetrievalQA.from_chain_type(llm=llm, retriever=retriever)
+
+    # Step 7: Ask your question
+    query = "What is the refund policy?"
+    answer = qa.run(query)
+
+    print(f"Q: {query}\nA: {answer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# stream_splitter.py
+# Zero-copy drop-in for RecursiveCharacterTextSplitter (default separators, keep_separator=True,
+# strip_whitespace=True, len as the length function).
+#
+# With keep_separator every split starts at a separator and the pieces are joined with "", so each
+# chunk LangChain produces is a contiguous slice of the input (stripped). SpanSplitter replays the
+# same recursion and merge/overlap rules on (offset, length) spans over a memory-mapped file and
+# only slices out a string when a consumer asks for it.
+#
+# Usage: with MappedText("company_policy.txt") as text:
+#            for offset, length in SpanSplitter(300, 50).spans(text.buffer): ...
+
+import mmap
+import os
+import re
+from collections import deque
+
+SEPARATORS = ("\n\n", "\n", " ", "")
+# str.strip() removes every character for which isspace() is true, which in ASCII is more than
+# bytes.strip() does (it also drops \x1c-\x1f).
+_ASCII_SPACE = frozenset(i for i in range(128) if chr(i).isspace())
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+class MappedText:
+    """A file as a buffer the splitter can scan without copying.
+
+    Pure-ASCII files without carriage returns are used straight from the mmap (byte offsets ==
+    character offsets). Anything else is decoded once into a str, with universal newlines like
+    TextLoader's ``open()``, and spans index into that string.
+    """
+
+    def __init__(self, path, encoding="utf-8", universal_newlines=True):
+        self.path = path
+        self.encoding = encoding
+        self.universal_newlines = universal_newlines
+        self.buffer = ""
+        self._file = self._map = None
+
+    def __enter__(self):
+        self._file = open(self.path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            return self
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if _NON_ASCII.search(self._map) or (self.universal_newlines and self._map.find(b"\r") != -1):
+            text = str(self._map, self.encoding)
+            if self.universal_newlines:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+            self.buffer = text
+            self.close()
+        else:
+            self.buffer = self._map
+        return self
+
+    def __exit__(self, *exc):
+        self.buffer = ""
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def mapped(self):
+        return self._map is not None
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def text(self, offset, length):
+        """Materialize one span as a str."""
+        piece = self.buffer[offset:offset + length]
+        return piece if isinstance(piece, str) else piece.decode("ascii")
+
+
+class SpanSplitter:
+    """Yields ``(offset, length)`` chunk spans identical to RecursiveCharacterTextSplitter's chunks."""
+
+    def __init__(self, chunk_size=4000, chunk_overlap=200, separators=SEPARATORS):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators)
+        self._patterns = {}
+
+    def _compiled(self, buffer):
+        # One set of patterns per buffer kind: str patterns for decoded text, bytes for the mmap.
+        kind = isinstance(buffer, str)
+        if kind not in self._patterns:
+            self._patterns[kind] = [
+                re.compile(re.escape(s if kind else s.encode("ascii"))) if s else None
+                for s in self.separators
+            ]
+        return self._patterns[kind]
+
+    def spans(self, buffer):
+        """Chunk spans over a str or an ASCII bytes-like buffer (e.g. ``MappedText.buffer``)."""
+        if len(buffer):
+            yield from self._split(buffer, 0, len(buffer), 0, self._compiled(buffer))
+
+    def chunks(self, text):
+        """Materialized chunk strings for a ``MappedText``, one at a time."""
+        for offset, length in self.spans(text.buffer):
+            yield text.text(offset, length)
+
+    def split_text(self, text):
+        """Same result as ``RecursiveCharacterTextSplitter.split_text``."""
+        return [text[offset:offset + length] for offset, length in self.spans(text)]
+
+    def _split(self, buffer, start, end, level, patterns):
+        # Pick the first separator present in [start, end); the ones after it are used to
+        # re-split pieces that are still too long.
+        pattern, deeper = patterns[-1], None
+        for i in range(level, len(patterns)):
+            if patterns[i] is None:
+                pattern = None
+                break
+            if patterns[i].search(buffer, start, end):
+                pattern = patterns[i]
+                deeper = i + 1 if i + 1 < len(patterns) else None
+                break
+
+        window, total = deque(), 0
+        for a, b in self._pieces(buffer, start, end, pattern):
+            n = b - a
+            if n < self.chunk_size:
+                if window and total + n > self.chunk_size:
+                    yield from self._strip(buffer, window[0][0], window[-1][1])
+                    while total > self.chunk_overlap or (total + n > self.chunk_size and total > 0):
+                        first = window.popleft()
+                        total -= first[1] - first[0]
+                window.append((a, b))
+                total += n
+                continue
+            if window:
+                yield from self._strip(buffer, window[0][0], window[-1][1])
+                window.clear()
+                total = 0
+            if deeper is None:
+                yield a, n
+            else:
+                yield from self._split(buffer, a, b, deeper, patterns)
+        if window:
+            yield from self._strip(buffer, window[0][0], window[-1][1])
+
+    @staticmethod
+    def _pieces(buffer, start, end, pattern):
+        # re.split with a capturing group, separators glued to the following piece: every piece
+        # starts at a separator match.
+        if pattern is None:
+            for i in range(start, end):
+                yield i, i + 1
+            return
+        prev = start
+        for m in pattern.finditer(buffer, start, end):
+            if m.start() > prev:
+                yield prev, m.start()
+                prev = m.start()
+        if end > prev:
+            yield prev, end
+
+    @staticmethod
+    def _strip(buffer, start, end):
+        if isinstance(buffer, str):
+            while start < end and buffer[start].isspace():
+                start += 1
+            while end > start and buffer[end - 1].isspace():
+                end -= 1
+        else:
+            while start < end and buffer[start] in _ASCII_SPACE:
+                start += 1
+            while end > start and buffer[end - 1] in _ASCII_SPACE:
+                end -= 1
+        if end > start:
+            yield start, end - start
@@ -0,0 +1,140 @@
+# bedrock_client.py
+# Async front end for the Bedrock runtime used by main.py.
+#
+# boto3 is blocking, so calls run on a bounded thread pool sized to the concurrency limit, over a
+# botocore connection pool of the same size (connections are reused, never one per request).
+# An asyncio semaphore caps in-flight calls, and at most ``max_queue`` requests may wait for a
+# slot; beyond that ``Overloaded`` is raised so the API can shed load with a 503 instead of
+# queueing without bound.
+#
+# Point ``endpoint_url`` at stub_bedrock.py to run without AWS.
+
+import asyncio
+import contextlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_MODEL_ID = "anthropic.claude-v2"
+
+
+class Overloaded(Exception):
+    """More requests are waiting for a model slot than the queue limit allows."""
+
+
+class AsyncBedrock:
+    def __init__(self, model_id=DEFAULT_MODEL_ID, region=None, endpoint_url=None,
+                 max_concurrency=16, max_queue=64, pool_size=None, timeout=60):
+        self.model_id = model_id
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.pool_size = pool_size or max_concurrency
+        self._client = boto3.client(
+            "bedrock-runtime",
+            region_name=region,
+            endpoint_url=endpoint_url,
+            config=Config(
+                max_pool_connections=self.pool_size,
+                connect_timeout=5,
+                read_timeout=timeout,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bedrock")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def check_capacity(self):
+        """Raise ``Overloaded`` if a new request would have to queue past ``max_queue``."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"{self.waiting} requests already waiting for {self.max_concurrency} model slots")
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        self.check_capacity()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def _request(self, body):
+        return {"modelId": self.model_id, "contentType": "application/json",
+                "accept": "application/json", "body": json.dumps(body)}
+
+    def _invoke_sync(self, body):
+        response = self._client.invoke_model(**self._request(body))
+        return json.loads(response["body"].read())
+
+    async def invoke(self, body):
+        """The full model response as a dict."""
+        async with self._slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._invoke_sync, body)
+
+    async def stream(self, body):
+        """Yield response chunks (dicts) from ``invoke_model_with_response_stream`` as they arrive."""
+        async with self._slot():
+            loop = asyncio.get_running_loop()
+            queue = asyncio.Queue()
+            done = object()
+            stop = threading.Event()
+
+            def pump():
+                # Runs on the pool: reads the event stream and hands chunks back to the loop.
+                try:
+                    events = self._client.invoke_model_with_response_stream(**self._request(body))["body"]
+                    try:
+                        for event in events:
+                            if stop.is_set():
+                                break
+                            if "chunk" in event:
+                                loop.call_soon_threadsafe(queue.put_nowait, json.loads(event["chunk"]["bytes"]))
+                    finally:
+                        events.close()
+                except Exception as exc:
+                    loop.call_soon_threadsafe(queue.put_nowait, exc)
+                finally:
+                    loop.call_soon_threadsafe(queue.put_nowait, done)
+
+            loop.run_in_executor(self._executor, pump)
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                # Client went away or we finished: let the reader thread drop the stream.
+                stop.set()
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "pool_size": self.pool_size,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._client.close()
@@ -0,0 +1,170 @@
+# coalesce.py
+# Request coalescing for /ask:
+#   single-flight  concurrent requests with an identical body share one upstream call
+#   micro-batching for backends that can generate several prompts at once (a local HF model),
+#                  distinct requests with the same generation parameters that arrive within
+#                  ``window`` seconds are dispatched together, up to ``max_batch`` per call
+#
+# Backends expose ``supports_batching`` plus ``async generate(body)`` and, when batching,
+# ``async generate_batch(bodies)``; both return Bedrock-shaped dicts ({"completion": ...}).
+
+import asyncio
+import json
+import time
+
+from response_cache import params_key
+
+
+def body_key(body):
+    return json.dumps(body, sort_keys=True)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, fn):
+        """Run ``fn()`` once per key at a time. Returns ``(result, leader)``."""
+        task = self._inflight.get(key)
+        leader = task is None
+        if leader:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # Shielded so one impatient caller cancelling does not cancel the call for the others.
+        return await asyncio.shield(task), leader
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn, window=0.01, max_batch=16):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}          # group -> [(body, future)]
+        self._timers = {}           # group -> TimerHandle of its window flush
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, body, group):
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(group, [])
+        pending.append((body, future))
+        if len(pending) == 1:
+            self._timers[group] = asyncio.get_running_loop().call_later(self.window, self._flush, group)
+        elif len(pending) >= self.max_batch:
+            self._flush(group)
+        return await future
+
+    def _flush(self, group):
+        # A size-triggered flush cancels the window timer, which would otherwise fire later and
+        # flush the next batch of this group before its window is up.
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(group, None)
+        if batch:
+            self.batches += 1
+            self.items += len(batch)
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        try:
+            results = await self.batch_fn([body for body, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class Coalescer:
+    def __init__(self, backend, window=0.01, max_batch=16):
+        self.backend = backend
+        self.flights = SingleFlight()
+        self.batcher = MicroBatcher(backend.generate_batch, window, max_batch) if backend.supports_batching else None
+
+    async def _call(self, body):
+        started = time.perf_counter()
+        if self.batcher is not None:
+            output = await self.batcher.submit(body, params_key(body))
+        else:
+            output = await self.backend.generate(body)
+        return output, time.perf_counter() - started
+
+    async def complete(self, body):
+        """``(output, upstream_seconds, leader)``; only the leader's call reached the backend."""
+        (output, seconds), leader = await self.flights.do(body_key(body), lambda: self._call(body))
+        return output, seconds, leader
+
+    def stats(self):
+        out = {"backend": type(self.backend).__name__, "upstream_calls": self.flights.calls,
+               "coalesced": self.flights.shared}
+        if self.batcher is not None:
+            out["batches"] = self.batcher.batches
+            out["mean_batch_size"] = round(self.batcher.items / self.batcher.batches, 2) if self.batcher.batches else 0.0
+        return out
+
+
+class BedrockBackend:
+    """Bedrock has no batch API: single-flight only."""
+    supports_batching = False
+
+    def __init__(self, client):
+        self.client = client
+
+    async def generate(self, body):
+        return await self.client.invoke(body)
+
+
+class HFBackend:
+    """Local transformers text2text model; one padded ``generate`` per micro-batch."""
+    supports_batching = True
+
+    def __init__(self, model_name="google/flan-t5-small", device=-1):
+        from transformers import pipeline
+        self.pipe = pipeline("text2text-generation", model=model_name, device=device)
+
+    def _generate(self, bodies):
+        first = bodies[0]       # a batch shares its generation parameters
+        prompts = [b["prompt"].rsplit("Human:", 1)[-1].split("\n\nAssistant:", 1)[0].strip() for b in bodies]
+        sample = first["temperature"] > 0
+        kwargs = {"max_new_tokens": first["max_tokens_to_sample"], "do_sample": sample}
+        if sample:
+            kwargs.update(temperature=first["temperature"], top_k=first["top_k"], top_p=first["top_p"])
+        outputs = self.pipe(prompts, batch_size=len(prompts), **kwargs)
+        return [{"completion": out["generated_text"], "stop_reason": "stop_sequence"} for out in outputs]
+
+    async def generate(self, body):
+        return (await self.generate_batch([body]))[0]
+
+    async def generate_batch(self, bodies):
+        return await asyncio.to_thread(self._generate, bodies)
+
+
+class MockBackend:
+    """Fixed latency per call plus a small per-item cost, as batched accelerators behave,
+    serving at most ``max_concurrency`` calls at a time (GPU streams, account throughput)."""
+
+    def __init__(self, latency=0.2, per_item=0.005, supports_batching=True, max_concurrency=4):
+        self.latency = latency
+        self.per_item = per_item
+        self.supports_batching = supports_batching
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.calls = 0
+
+    async def generate(self, body):
+        return (await self.generate_batch([body]))[0]
+
+    async def generate_batch(self, bodies):
+        self.calls += 1
+        async with self.slots:
+            await asyncio.sleep(self.latency + self.per_item * len(bodies))
+        return [{"completion": " echo: " + b["prompt"], "stop_reason": "stop_sequence"} for b in bodies]
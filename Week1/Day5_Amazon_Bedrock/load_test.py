@@ -0,0 +1,77 @@
+# load_test.py
+# Throughput of the /ask miss path with and without coalescing, against MockBackend.
+# Clients issue bursts of requests drawn from a Zipf distribution over a fixed prompt set, so
+# identical requests overlap in flight as they do under real traffic.
+#   direct    every request calls the backend
+#   single    single-flight only (what Bedrock gets)
+#   batched   single-flight + micro-batching window (what a local HF model gets)
+#
+# Usage: python load_test.py --requests 2000 --concurrency 64 --prompts 200 --latency 0.2 --slots 4
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from coalesce import Coalescer, MockBackend
+
+BODY = {"max_tokens_to_sample": 200, "temperature": 0.7, "top_k": 250, "top_p": 1,
+        "stop_sequences": ["\n\nHuman:"]}
+
+
+async def run(mode, prompts, concurrency, latency, per_item, window, max_batch, slots):
+    backend = MockBackend(latency, per_item, supports_batching=mode == "batched", max_concurrency=slots)
+    coalescer = Coalescer(backend, window, max_batch)
+    queue = list(prompts)
+    latencies = []
+
+    async def client():
+        while queue:
+            body = {"prompt": f"\n\nHuman: {queue.pop()}\n\nAssistant:", **BODY}
+            started = time.perf_counter()
+            if mode == "direct":
+                await backend.generate(body)
+            else:
+                await coalescer.complete(body)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ms = np.array(latencies) * 1000
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "upstream_calls": backend.calls,
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test request coalescing against a mock backend.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--prompts", type=int, default=200, help="distinct prompts (default: 200)")
+    parser.add_argument("--zipf", type=float, default=1.2, help="popularity skew (default: 1.2)")
+    parser.add_argument("--latency", type=float, default=0.2, help="backend seconds per call (default: 0.2)")
+    parser.add_argument("--per-item", type=float, default=0.005, help="extra backend seconds per batched item")
+    parser.add_argument("--slots", type=int, default=4, help="calls the backend serves at once (default: 4)")
+    parser.add_argument("--window-ms", type=float, default=10)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--modes", nargs="+", choices=["direct", "single", "batched"], default=["direct", "single", "batched"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ranks = (rng.zipf(args.zipf, args.requests) - 1) % args.prompts
+    prompts = [f"question {r}" for r in ranks]
+    for mode in args.modes:
+        row = asyncio.run(run(mode, prompts, args.concurrency, args.latency, args.per_item,
+                              args.window_ms / 1000, args.max_batch, args.slots))
+        print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,133 @@
-import os
-import boto3
-from fastapi import FastAPI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-client = boto3.client('bedrock-runtime', region_name=os.getenv("AWS_REGION"))
-
-app = FastAPI()
-
-@app.get("/ask")
-def ask(prompt: str):
-    body = {
-        "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
-        "max_tokens_to_sample": 200,
-        "temperature": 0.7,
-        "top_k": 250,
-        "top_p": 1,
-        "stop_sequences": ["\n\nHuman:"]
-    }
-
-    response = client.invoke_model(
-        modelId='anthropic.claude-v2',
-        contentType='application/json',
-        accept='application/json',
-        body=json.dumps(body)
-    )
-
-    output = json.loads(response['body'].read())
-    return {"response": output['completion']}
+import json
+import os
+import time
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
+
+from bedrock_client import AsyncBedrock, DEFAULT_MODEL_ID, Overloaded
+from coalesce import BedrockBackend, Coalescer, HFBackend, MockBackend
+from response_cache import ResponseCache, SemanticCache, sentence_embedder
+
+load_dotenv()
+
+# BEDROCK_ENDPOINT_URL points the client at stub_bedrock.py for local runs.
+client = AsyncBedrock(
+    model_id=os.getenv("BEDROCK_MODEL_ID", DEFAULT_MODEL_ID),
+    region=os.getenv("AWS_REGION"),
+    endpoint_url=os.getenv("BEDROCK_ENDPOINT_URL"),
+    max_concurrency=int(os.getenv("BEDROCK_MAX_CONCURRENCY", "16")),
+    max_queue=int(os.getenv("BEDROCK_MAX_QUEUE", "64")),
+    pool_size=int(os.getenv("BEDROCK_POOL_SIZE", "0")) or None,
+)
+
+# Exact-match tier always on; SEMANTIC_CACHE=1 adds the embedding-similarity tier.
+semantic = None
+if os.getenv("SEMANTIC_CACHE", "0") == "1":
+    semantic = SemanticCache(
+        sentence_embedder(os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")),
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+        ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+    )
+cache = ResponseCache(maxsize=int(os.getenv("CACHE_SIZE", "1024")), semantic=semantic)
+
+# Cache misses go through single-flight (identical concurrent requests share one call) and, for
+# ASK_BACKEND=hf / mock, a micro-batching window. /ask/stream always goes straight to Bedrock.
+backend_name = os.getenv("ASK_BACKEND", "bedrock")
+if backend_name == "hf":
+    backend = HFBackend(os.getenv("HF_MODEL", "google/flan-t5-small"))
+elif backend_name == "mock":
+    backend = MockBackend()
+else:
+    backend = BedrockBackend(client)
+coalescer = Coalescer(
+    backend,
+    window=float(os.getenv("COALESCE_WINDOW_MS", "10")) / 1000,
+    max_batch=int(os.getenv("COALESCE_MAX_BATCH", "16")),
+)
+
+app = FastAPI()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    client.close()
+
+
+def build_body(prompt, max_tokens_to_sample=200, temperature=0.7, top_k=250, top_p=1):
+    return {
+        "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
+        "max_tokens_to_sample": max_tokens_to_sample,
+        "temperature": temperature,
+        "top_k": top_k,
+        "top_p": top_p,
+        "stop_sequences": ["\n\nHuman:"]
+    }
+
+
+def overloaded(exc):
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
+
+@app.get("/ask")
+async def ask(prompt: str, max_tokens_to_sample: int = 200, temperature: float = 0.7,
+              top_k: int = 250, top_p: float = 1):
+    body = build_body(prompt, max_tokens_to_sample, temperature, top_k, top_p)
+    lookup = await cache.lookup(prompt, body)
+    if lookup.entry is not None:
+        return {"response": lookup.value['completion'], "cached": lookup.tier}
+    try:
+        output, seconds, leader = await coalescer.complete(body)
+    except Overloaded as exc:
+        raise overloaded(exc)
+    if leader:
+        cache.store(lookup, output, seconds)
+    return {"response": output['completion']}
+
+
+def sse(data, event=None):
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+@app.get("/ask/stream")
+async def ask_stream(prompt: str, max_tokens_to_sample: int = 200, temperature: float = 0.7,
+                     top_k: int = 250, top_p: float = 1):
+    """Relay the completion as Server-Sent Events while Bedrock generates it."""
+    body = build_body(prompt, max_tokens_to_sample, temperature, top_k, top_p)
+    lookup = await cache.lookup(prompt, body)
+    if lookup.entry is None:
+        # Reject before the 200 goes out; a request that loses the race still gets an error event.
+        try:
+            client.check_capacity()
+        except Overloaded as exc:
+            raise overloaded(exc)
+
+    async def events():
+        if lookup.entry is not None:
+            yield sse({"completion": lookup.value["completion"]})
+            yield sse({"stop_reason": lookup.value.get("stop_reason"), "cached": lookup.tier}, event="done")
+            return
+        started = time.perf_counter()
+        parts = []
+        try:
+            async for chunk in client.stream(body):
+                parts.append(chunk.get("completion", ""))
+                yield sse({"completion": parts[-1]})
+                if chunk.get("stop_reason"):
+                    # Only complete generations are cached.
+                    cache.store(lookup, {"completion": "".join(parts), "stop_reason": chunk["stop_reason"]},
+                                time.perf_counter() - started)
+                    yield sse({"stop_reason": chunk["stop_reason"]}, event="done")
+        except Exception as exc:
+            yield sse({"error": str(exc)}, event="error")
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/metrics")
+def metrics():
+    """Cache hit ratio and latency saved, coalescing counters and model slot usage."""
+    return {"cache": cache.stats(), "coalescing": coalescer.stats(), "bedrock": client.stats()}
@@ -0,0 +1,185 @@
+# response_cache.py
+# Two-tier cache in front of the Bedrock call in main.py.
+#   tier 1  exact LRU keyed on the normalized prompt + generation parameters
+#   tier 2  optional semantic tier: nearest cached prompt (cosine similarity of sentence
+#           embeddings) with the same generation parameters, if above ``threshold`` and younger
+#           than ``ttl`` seconds
+# Every hit is credited with the upstream latency it avoided, for the /metrics endpoint.
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+GENERATION_PARAMS = ("max_tokens_to_sample", "temperature", "top_k", "top_p")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Case- and whitespace-insensitive form of a prompt."""
+    return _SPACE.sub(" ", prompt).strip().casefold()
+
+
+def params_key(body):
+    return tuple(body.get(name) for name in GENERATION_PARAMS)
+
+
+def sentence_embedder(model_name="all-MiniLM-L6-v2"):
+    """``embed(texts) -> unit-norm float32 matrix`` backed by sentence-transformers (loaded lazily)."""
+    model = None
+
+    def embed(texts):
+        nonlocal model
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        return model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+    return embed
+
+
+@dataclass
+class Entry:
+    value: Any
+    seconds: float          # upstream latency of the call that produced ``value``
+
+
+class ExactCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SemanticCache:
+    def __init__(self, embed, threshold=0.92, ttl=3600.0, maxsize=1024, clock=time.monotonic):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._vectors = None                  # (n, dim) unit rows
+        self._params = []
+        self._entries = []
+        self._expires = np.empty(0)
+
+    def _keep(self, mask):
+        self._vectors = self._vectors[mask]
+        self._expires = self._expires[mask]
+        self._params = [p for p, keep in zip(self._params, mask) if keep]
+        self._entries = [e for e, keep in zip(self._entries, mask) if keep]
+
+    def evict_expired(self):
+        if len(self._entries) and self._expires.min() <= self.clock():
+            self._keep(self._expires > self.clock())
+
+    def get(self, vector, params):
+        self.evict_expired()
+        if not self._entries:
+            return None
+        sims = self._vectors @ vector
+        sims[[p != params for p in self._params]] = -np.inf
+        best = int(np.argmax(sims))
+        return self._entries[best] if sims[best] >= self.threshold else None
+
+    def put(self, vector, params, entry):
+        self.evict_expired()
+        if len(self._entries) >= self.maxsize:
+            # Full: drop the entries closest to expiry.
+            keep = np.ones(len(self._entries), dtype=bool)
+            keep[np.argsort(self._expires)[:len(self._entries) - self.maxsize + 1]] = False
+            self._keep(keep)
+        row = vector[None, :]
+        self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+        self._expires = np.append(self._expires, self.clock() + self.ttl)
+        self._params.append(params)
+        self._entries.append(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@dataclass
+class Lookup:
+    key: tuple
+    prompt: str
+    entry: Optional[Entry] = None
+    tier: Optional[str] = None
+    vector: Any = None
+
+    @property
+    def value(self):
+        return self.entry.value if self.entry else None
+
+
+class ResponseCache:
+    def __init__(self, maxsize=1024, semantic=None):
+        self.exact = ExactCache(maxsize)
+        self.semantic = semantic
+        self.requests = 0
+        self.hits = {"exact": 0, "semantic": 0}
+        self.latency_saved = 0.0
+        self.upstream_seconds = 0.0
+        self.upstream_calls = 0
+
+    async def lookup(self, prompt, body):
+        """Check both tiers. On a miss the returned Lookup is passed back to ``store``."""
+        started = time.perf_counter()
+        self.requests += 1
+        prompt = normalize_prompt(prompt)
+        lookup = Lookup(key=(prompt,) + params_key(body), prompt=prompt)
+        lookup.entry = self.exact.get(lookup.key)
+        if lookup.entry is not None:
+            lookup.tier = "exact"
+        elif self.semantic is not None:
+            # Embedding is CPU-bound; keep it off the event loop.
+            lookup.vector = (await asyncio.to_thread(self.semantic.embed, [prompt]))[0]
+            lookup.entry = self.semantic.get(lookup.vector, lookup.key[1:])
+            if lookup.entry is not None:
+                lookup.tier = "semantic"
+                self.exact.put(lookup.key, lookup.entry)
+        if lookup.entry is not None:
+            self.hits[lookup.tier] += 1
+            self.latency_saved += max(0.0, lookup.entry.seconds - (time.perf_counter() - started))
+        return lookup
+
+    def store(self, lookup, value, seconds):
+        entry = Entry(value, seconds)
+        self.upstream_calls += 1
+        self.upstream_seconds += seconds
+        self.exact.put(lookup.key, entry)
+        if self.semantic is not None and lookup.vector is not None:
+            self.semantic.put(lookup.vector, lookup.key[1:], entry)
+
+    def stats(self):
+        hits = sum(self.hits.values())
+        return {
+            "requests": self.requests,
+            "hits": hits,
+            "exact_hits": self.hits["exact"],
+            "semantic_hits": self.hits["semantic"],
+            "misses": self.requests - hits,
+            "hit_ratio": hits / self.requests if self.requests else 0.0,
+            "latency_saved_s": round(self.latency_saved, 4),
+            "mean_upstream_ms": round(self.upstream_seconds / self.upstream_calls * 1000, 2) if self.upstream_calls else 0.0,
+            "exact_size": len(self.exact),
+            "semantic_size": len(self.semantic) if self.semantic is not None else None,
+        }
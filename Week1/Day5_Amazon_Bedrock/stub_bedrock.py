@@ -0,0 +1,112 @@
+# stub_bedrock.py
+# Local stand-in for the Bedrock runtime API, for running main.py and load tests without AWS.
+#   POST /model/{modelId}/invoke                       -> {"completion": ..., "stop_reason": ...}
+#   POST /model/{modelId}/invoke-with-response-stream  -> application/vnd.amazon.eventstream
+# The completion echoes the prompt's last Human turn. Requests are not authenticated, so any
+# credentials work (boto3 still needs some to sign with).
+#
+# Usage: python stub_bedrock.py --port 8001 --latency 0.2 --token-delay 0.02
+#        BEDROCK_ENDPOINT_URL=http://127.0.0.1:8001 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x \
+#            uvicorn main:app
+
+import argparse
+import base64
+import json
+import re
+import struct
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROUTE = re.compile(r"^/model/(?P<model>[^/]+)/(?P<action>invoke|invoke-with-response-stream)$")
+
+
+def _header(name, value):
+    name, value = name.encode(), value.encode()
+    return struct.pack("!B", len(name)) + name + b"\x07" + struct.pack("!H", len(value)) + value
+
+
+def encode_event(payload, event_type="chunk"):
+    """One AWS event-stream message: prelude, string headers, payload, CRC32s."""
+    headers = (_header(":event-type", event_type) + _header(":content-type", "application/json")
+               + _header(":message-type", "event"))
+    prelude = struct.pack("!II", 16 + len(headers) + len(payload), len(headers))
+    prelude += struct.pack("!I", zlib.crc32(prelude))
+    message = prelude + headers + payload
+    return message + struct.pack("!I", zlib.crc32(message))
+
+
+def reply_for(body):
+    prompt = body.get("prompt", "")
+    question = prompt.rsplit("Human:", 1)[-1].split("\n\nAssistant:", 1)[0].strip()
+    words = f"You asked: {question}".split()
+    return words[:body.get("max_tokens_to_sample", len(words))]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so the client's connection pool is exercised
+    latency = 0.0
+    token_delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        match = ROUTE.match(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not match:
+            self._json(404, {"message": f"Unknown path {self.path}"})
+            return
+        time.sleep(self.latency)
+        words = reply_for(body)
+        if match["action"] == "invoke":
+            self._json(200, {"completion": " " + " ".join(words), "stop_reason": "stop_sequence"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("X-Amzn-Bedrock-Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            chunk = {"completion": " " + word, "stop_reason": "stop_sequence" if last else None}
+            payload = json.dumps({"bytes": base64.b64encode(json.dumps(chunk).encode()).decode()}).encode()
+            message = encode_event(payload)
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(message), message))
+            self.wfile.flush()
+            if not last:
+                time.sleep(self.token_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve(host="127.0.0.1", port=8001, latency=0.0, token_delay=0.0):
+    """Start the stub; returns the server (call ``serve_forever`` or run it in a thread)."""
+    handler = type("Handler", (StubHandler,), {"latency": latency, "token_delay": token_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Bedrock runtime server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before the first byte (default: 0.2)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed chunks (default: 0.02)")
+    args = parser.parse_args()
+    server = serve(args.host, args.port, args.latency, args.token_delay)
+    print(f"Stub Bedrock runtime on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
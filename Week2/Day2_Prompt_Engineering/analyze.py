@@ -1,5 +1,22 @@
+import argparse
+import json
 import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# A sentence is any run between terminators that holds something other than whitespace, which
+# counts the same as splitting on r'[.!?]+' and dropping blank pieces.
+SENTENCE = re.compile(r"[^.!?\s][^.!?]*")
+METRICS = ["word_count", "sentence_count", "avg_sentence_length", "lexical_diversity"]
+DEFAULT_INPUTS = ["outputs/role_output.txt", "outputs/chain_of_thought_output.txt"]
+
 
 def read_file(path):
     try:
@@ -10,63 +27,137 @@ def read_file(path):
         print(f"⚠️ File not found: {path}")
         return ""
 
+
+def batch_metrics(texts):
+    """Metrics for a batch of texts as a dict of column arrays (runs in the worker processes)."""
+    words = np.empty(len(texts), dtype=np.int64)
+    unique = np.empty(len(texts), dtype=np.int64)
+    sentences = np.empty(len(texts), dtype=np.int64)
+    count = SENTENCE.findall
+    for i, text in enumerate(texts):
+        tokens = text.split()
+        words[i] = len(tokens)
+        unique[i] = len(set(tokens))
+        sentences[i] = len(count(text))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.where(sentences > 0, words / sentences, 0.0)
+        diversity = np.where(words > 0, unique / words, 0.0)
+    return {"word_count": words, "sentence_count": sentences,
+            "avg_sentence_length": avg, "lexical_diversity": diversity}
+
+
 def calculate_metrics(text):
-    words = text.split()
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    word_count = len(words)
-    sentence_count = len(sentences)
-    avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
-    lexical_diversity = len(set(words)) / len(words) if words else 0
-    return {
-        "word_count": word_count,
-        "sentence_count": sentence_count,
-        "avg_sentence_length": avg_sentence_length,
-        "lexical_diversity": lexical_diversity
-    }
-
-role_text = read_file("outputs/role_output.txt")
-cot_text = read_file("outputs/chain_of_thought_output.txt")
-
-if not role_text or not cot_text:
-    print("⚠️ One or both prompt outputs are empty. Please run main.py first.")
-    exit()
-
-role_metrics = calculate_metrics(role_text)
-cot_metrics = calculate_metrics(cot_text)
-
-# Save metrics to file
-os.makedirs("outputs", exist_ok=True)
-with open("outputs/metrics_readable.txt", "w", encoding="utf-8") as f:
-    f.write(f"=== Prompt Output Comparison ===\n\n")
-    f.write(f"Role-Based Prompt:\n")
-    f.write(f"- Word count: {role_metrics['word_count']}\n")
-    f.write(f"- Sentence count: {role_metrics['sentence_count']}\n")
-    f.write(f"- Average sentence length: {role_metrics['avg_sentence_length']:.1f} words\n")
-    f.write(f"- Lexical diversity: {role_metrics['lexical_diversity']:.2f}\n\n")
-    
-    f.write(f"Chain-of-Thought Prompt:\n")
-    f.write(f"- Word count: {cot_metrics['word_count']}\n")
-    f.write(f"- Sentence count: {cot_metrics['sentence_count']}\n")
-    f.write(f"- Average sentence length: {cot_metrics['avg_sentence_length']:.1f} words\n")
-    f.write(f"- Lexical diversity: {cot_metrics['lexical_diversity']:.2f}\n\n")
-
-    f.write("Differences:\n")
-    f.write(f"- Chain-of-Thought output is longer ({cot_metrics['word_count'] - role_metrics['word_count']} more words).\n")
-
-# Print comparison directly in terminal
-print("=== Prompt Output Comparison ===")
-print("\nRole-Based Prompt:")
-print(f"- Word count: {role_metrics['word_count']}")
-print(f"- Sentence count: {role_metrics['sentence_count']}")
-print(f"- Average sentence length: {role_metrics['avg_sentence_length']:.1f} words")
-print(f"- Lexical diversity: {role_metrics['lexical_diversity']:.2f}")
-
-print("\nChain-of-Thought Prompt:")
-print(f"- Word count: {cot_metrics['word_count']}")
-print(f"- Sentence count: {cot_metrics['sentence_count']}")
-print(f"- Average sentence length: {cot_metrics['avg_sentence_length']:.1f} words")
-print(f"- Lexical diversity: {cot_metrics['lexical_diversity']:.2f}")
-
-print("\nDifferences:")
-print(f"- Chain-of-Thought output is longer ({cot_metrics['word_count'] - role_metrics['word_count']} more words).")
+    columns = batch_metrics([text])
+    return {name: columns[name][0].item() for name in METRICS}
+
+
+def iter_records(paths):
+    """Yield ``(default_variant, payload, where)``: raw JSONL lines (decoded in the workers, with
+    ``where`` = "file:line" for error messages) or whole plain-text files (``where`` = None),
+    whose variant is the file stem."""
+    for path in paths:
+        path = Path(path)
+        if path.suffix == ".jsonl":
+            with open(path, "r", encoding="utf-8") as f:
+                for lineno, line in enumerate(f, 1):
+                    if line.strip():
+                        yield path.stem, line, f"{path}:{lineno}"
+        else:
+            text = read_file(path)
+            if text:
+                yield path.stem, text, None
+
+
+def batched(records, size):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _score_batch(batch, text_field, variant_field):
+    variants, texts = [], []
+    for variant, payload, where in batch:
+        if where is not None:
+            try:
+                record = json.loads(payload)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{where}: invalid JSON ({exc})") from None
+            if not isinstance(record, dict) or not isinstance(record.get(text_field), str):
+                raise ValueError(f"{where}: record has no {text_field!r} text field")
+            variant, payload = str(record.get(variant_field, variant)), record[text_field]
+        variants.append(variant)
+        texts.append(payload)
+    return variants, batch_metrics(texts)
+
+
+def score(records, text_field="text", variant_field="variant", workers=None, batch_size=1024):
+    """Per-record metrics table, computed in worker processes, in input order."""
+    workers = workers or os.cpu_count()
+    frames = []
+
+    def collect(future):
+        variants, columns = future.result()
+        frames.append(pd.DataFrame({"variant": variants, **columns}))
+
+    task = partial(_score_batch, text_field=text_field, variant_field=variant_field)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # At most two batches per worker in flight, so input is read as fast as it is scored.
+        pending = deque()
+        for batch in batched(records, batch_size):
+            pending.append(pool.submit(task, batch))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    if not frames:
+        return pd.DataFrame(columns=["variant"] + METRICS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(table):
+    """One row per prompt variant: record count and the mean of each metric."""
+    summary = table.groupby("variant", sort=False)[METRICS].mean()
+    summary.insert(0, "outputs", table.groupby("variant", sort=False).size())
+    return summary.reset_index()
+
+
+def write_table(df, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text metrics per prompt variant.")
+    parser.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS,
+                        help="plain-text output files (variant = file name) or JSONL records")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the output text")
+    parser.add_argument("--variant-field", default="variant", help="JSONL field naming the prompt variant")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=1024, help="texts per worker task (default: 1024)")
+    parser.add_argument("--out", default="outputs/metrics.csv", help="summary table (.csv or .parquet)")
+    parser.add_argument("--records", help="also write the per-output table here (.csv or .parquet)")
+    args = parser.parse_args()
+
+    try:
+        table = score(iter_records(args.inputs), args.text_field, args.variant_field, args.workers, args.batch_size)
+    except ValueError as exc:
+        raise SystemExit(f"⚠️ {exc}")
+    if table.empty:
+        print("⚠️ No prompt outputs found. Please run main.py first.")
+        return
+
+    summary = summarize(table)
+    write_table(summary, args.out)
+    if args.records:
+        write_table(table, args.records)
+
+    print("=== Prompt Output Comparison ===")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"\nSaved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,15 @@
-from transformers import pipeline
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import BACKENDS, default_backend, get_pipeline
+
+LABELS = {"Positive", "Negative"}
+
 
 def load_data(file_path):
     sentences, labels = [], []
@@ -10,48 +21,87 @@ def load_data(file_path):
                 labels.append(label.strip())
     return sentences, labels
 
+def build_zero_shot_prompt(sentence):
+    return f"Determine if the following sentence is Positive or Negative: '{sentence}'"
+
 def build_few_shot_prompt(template, sentence):
     return template.format(sentence=sentence)
 
-def predict_zero_shot(clf, sentences):
-    preds = []
-    for s in sentences:
-        prompt = f"Determine if the following sentence is Positive or Negative: '{s}'"
-        out = clf(prompt, max_new_tokens=5)[0]["generated_text"].strip()
-        normalized = out.split()[0].strip().strip(".").capitalize()
-        if normalized not in {"Positive", "Negative"}:
-            normalized = out
-        preds.append(normalized)
-    return preds
-
-def predict_few_shot(clf, template, sentences):
-    preds = []
-    for s in sentences:
-        prompt = build_few_shot_prompt(template, s)
-        out = clf(prompt, max_new_tokens=5)[0]["generated_text"].strip()
-        normalized = out.split()[0].strip().strip(".").capitalize()
-        if normalized not in {"Positive", "Negative"}:
-            normalized = out
-        preds.append(normalized)
-    return preds
+def normalize_label(out):
+    out = out.strip()
+    words = out.split()
+    normalized = words[0].strip().strip(".").capitalize() if words else ""
+    return normalized if normalized in LABELS else out
+
+def length_order(prompts, tokenizer):
+    """Indices of ``prompts`` sorted by token length, so each batch pads to similar lengths."""
+    lengths = [len(ids) for ids in tokenizer(prompts)["input_ids"]]
+    return sorted(range(len(prompts)), key=lengths.__getitem__)
+
+def run_variants(clf, variants, batch_size=8, max_new_tokens=5, bucket=True):
+    """Run every prompt of every variant ({name: [prompt, ...]}) through one batched loop.
+
+    Returns ({name: [prediction, ...]}, seconds). Prompts from all variants share the batches,
+    ordered by length when ``bucket`` is set; predictions come back in the original order.
+    """
+    jobs = [(name, i, prompt) for name, prompts in variants.items() for i, prompt in enumerate(prompts)]
+    order = length_order([p for _, _, p in jobs], clf.tokenizer) if bucket else list(range(len(jobs)))
+    preds = {name: [None] * len(prompts) for name, prompts in variants.items()}
+
+    def feed():
+        for j in order:
+            yield jobs[j][2]
+
+    start = time.perf_counter()
+    with torch.inference_mode():
+        outputs = clf(feed(), batch_size=batch_size, max_new_tokens=max_new_tokens)
+        for j, out in zip(order, outputs):
+            name, i, _ = jobs[j]
+            preds[name][i] = normalize_label(out[0]["generated_text"])
+    return preds, time.perf_counter() - start
+
+def predict_zero_shot(clf, sentences, batch_size=8):
+    preds, _ = run_variants(clf, {"zero": [build_zero_shot_prompt(s) for s in sentences]}, batch_size)
+    return preds["zero"]
+
+def predict_few_shot(clf, template, sentences, batch_size=8):
+    preds, _ = run_variants(clf, {"few": [build_few_shot_prompt(template, s) for s in sentences]}, batch_size)
+    return preds["few"]
 
 def accuracy(preds, labels):
     correct = sum(p == l for p, l in zip(preds, labels))
     return correct / len(labels) * 100
 
 def main():
-    sentences, labels = load_data("test_data.txt")
-    model_id = "google/flan-t5-large"
-    clf = pipeline("text2text-generation", model=model_id)
+    parser = argparse.ArgumentParser(description="Zero-shot vs few-shot sentiment accuracy.")
+    parser.add_argument("--model", default="google/flan-t5-large")
+    parser.add_argument("--data", default="test_data.txt")
+    parser.add_argument("--batch-size", type=int, default=8, help="prompts per forward pass (default: 8)")
+    parser.add_argument("--no-bucket", action="store_true", help="keep dataset order instead of length-bucketing")
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="fp32, int8 (dynamic quantization) or onnx (ONNX Runtime) (default: $MODEL_BACKEND or fp32)")
+    args = parser.parse_args()
+
+    sentences, labels = load_data(args.data)
+    clf = get_pipeline("text2text-generation", args.model, args.backend)
 
     # Load few-shot prompt
     with open("prompt_few.txt", "r", encoding="utf-8") as f:
         few_prompt = f.read()
 
-    print("Running Zero-Shot Predictions...")
-    zero_preds = predict_zero_shot(clf, sentences)
-    print("Running Few-Shot Predictions...")
-    few_preds = predict_few_shot(clf, few_prompt, sentences)
+    print("Running Zero-Shot and Few-Shot Predictions...")
+    preds, seconds = run_variants(
+        clf,
+        {
+            "zero": [build_zero_shot_prompt(s) for s in sentences],
+            "few": [build_few_shot_prompt(few_prompt, s) for s in sentences],
+        },
+        batch_size=args.batch_size,
+        bucket=not args.no_bucket,
+    )
+    zero_preds, few_preds = preds["zero"], preds["few"]
+    examples = len(zero_preds) + len(few_preds)
+    print(f"{examples} examples in {seconds:.2f}s ({examples / seconds:.1f} examples/sec, batch size {args.batch_size})")
 
     print("\n--- Accuracy Report ---")
     print(f"Zero-Shot Accuracy: {accuracy(zero_preds, labels):.2f}%")
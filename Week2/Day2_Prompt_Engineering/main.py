@@ -1,7 +1,12 @@
-from transformers import pipeline
+import os
+import sys
+from pathlib import Path
 
-# Load model
-generator = pipeline("text2text-generation", model="google/flan-t5-large", device=-1)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import get_pipeline
+
+# Load model (MODEL_BACKEND=int8|onnx for a faster CPU model)
+generator = get_pipeline("text2text-generation", "google/flan-t5-large", device=-1)
 
 # Role-based prompt
 role_prompt = "You are a high school biology teacher. Explain photosynthesis to students in simple words."
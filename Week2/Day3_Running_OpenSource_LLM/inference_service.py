@@ -0,0 +1,269 @@
+# inference_service.py
+# Local inference service for the summarization and sentiment models. Each model is loaded once
+# and owned by a BatchingWorker: a dedicated thread that collects queued requests into dynamic
+# batches (up to max_batch_size, or whatever arrived within max_wait seconds of the first one)
+# and runs them through the pipeline under torch.inference_mode. Callers get a Future per request.
+#
+# In-process:  service = InferenceService(); service.summarize(text).result()
+# Over HTTP:   python inference_service.py --port 8002
+#              curl -d '{"text": "I love it"}' localhost:8002/classify ; curl localhost:8002/metrics
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import BACKENDS, default_backend, get_pipeline
+
+SUMMARIZATION_MODEL = "sshleifer/distilbart-cnn-12-6"
+CLASSIFICATION_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+
+class BatchingWorker:
+    def __init__(self, name, run_batch, max_batch_size=16, max_wait=0.01, window=10000):
+        """``run_batch(inputs, **params)`` must return one result per input."""
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._stop = object()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.started = None
+        self.queue_latency = deque(maxlen=window)     # submit -> batch start, seconds
+        self.batch_seconds = deque(maxlen=window)
+        self._thread = threading.Thread(target=self._loop, name=f"{name}-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, item, **params):
+        future = Future()
+        self._queue.put((item, params, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is self._stop:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is self._stop:
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        # inference_mode is thread-local, so it is entered here, on the thread that runs the model.
+        with torch.inference_mode():
+            while (batch := self._collect()) is not None:
+                start = time.perf_counter()
+                if self.started is None:
+                    self.started = batch[0][3]
+                # Requests with different generation parameters cannot share a forward pass.
+                groups = {}
+                for request in batch:
+                    groups.setdefault(json.dumps(request[1], sort_keys=True), []).append(request)
+                for group in groups.values():
+                    self._run(group, start)
+                self.batch_seconds.append(time.perf_counter() - start)
+
+    def _run(self, group, start):
+        futures = [future for _, _, future, _ in group]
+        for _, _, _, submitted in group:
+            self.queue_latency.append(start - submitted)
+        self.batches += 1
+        self.requests += len(group)
+        try:
+            results = self.run_batch([item for item, _, _, _ in group], **group[0][1])
+        except Exception as exc:
+            self.errors += len(group)
+            for future in futures:
+                future.set_exception(exc)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def stats(self):
+        waits = np.array(self.queue_latency) * 1000
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "throughput_rps": round(self.requests / elapsed, 2) if elapsed else 0.0,
+            "queue_ms_p50": round(float(np.percentile(waits, 50)), 2) if len(waits) else 0.0,
+            "queue_ms_p99": round(float(np.percentile(waits, 99)), 2) if len(waits) else 0.0,
+            "batch_ms_mean": round(float(np.mean(self.batch_seconds)) * 1000, 2) if self.batch_seconds else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self):
+        self._queue.put(self._stop)
+        self._thread.join()
+
+
+class InferenceService:
+    def __init__(self, summarization_model=SUMMARIZATION_MODEL, classification_model=CLASSIFICATION_MODEL,
+                 max_batch_size=16, max_wait=0.01, device=-1, backend=None):
+        self.summarizer = get_pipeline("summarization", summarization_model, backend, device)
+        self.classifier = get_pipeline("sentiment-analysis", classification_model, backend, device)
+        self.workers = {
+            "summarize": BatchingWorker("summarize", self._summarize_batch, max_batch_size, max_wait),
+            "classify": BatchingWorker("classify", self._classify_batch, max_batch_size, max_wait),
+        }
+
+    def _summarize_batch(self, texts, **params):
+        params.setdefault("do_sample", False)
+        return [out["summary_text"] for out in self.summarizer(texts, batch_size=len(texts), truncation=True, **params)]
+
+    def _classify_batch(self, texts):
+        return self.classifier(texts, batch_size=len(texts), truncation=True)
+
+    def summarize(self, text, max_length=30, min_length=10):
+        """Future resolving to the summary string."""
+        return self.workers["summarize"].submit(text, max_length=max_length, min_length=min_length)
+
+    def classify(self, text):
+        """Future resolving to ``{"label": ..., "score": ...}``."""
+        return self.workers["classify"].submit(text)
+
+    def stats(self):
+        return {name: worker.stats() for name, worker in self.workers.items()}
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+
+
+class ServiceUnavailable(ConnectionError):
+    """No inference service answered at the client's URL (refused, reset or timed out)."""
+
+
+class ServiceClient:
+    """Talks to a running ``python inference_service.py`` so scripts skip loading the models.
+
+    Raises ServiceUnavailable when the service cannot be reached; HTTP errors from a running
+    service propagate as ``urllib.error.HTTPError``.
+    """
+
+    def __init__(self, url="http://127.0.0.1:8002", timeout=120):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(self.url + path, data=json.dumps(payload).encode(),
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError:
+            raise
+        except urllib.error.URLError as exc:
+            if isinstance(exc.reason, (ConnectionError, TimeoutError)):
+                raise ServiceUnavailable(f"{self.url}: {exc.reason}") from exc
+            raise
+        except TimeoutError as exc:
+            raise ServiceUnavailable(f"{self.url}: timed out") from exc
+
+    def summarize(self, text, max_length=30, min_length=10):
+        return self._post("/summarize", {"text": text, "max_length": max_length, "min_length": min_length})["summary"]
+
+    def classify(self, text):
+        return self._post("/classify", {"text": text})["prediction"]
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, obj, status=200):
+            data = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._json(service.stats())
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if "text" not in body:
+                self._json({"error": "expected a JSON body with 'text'"}, 400)
+                return
+            if self.path == "/summarize":
+                params = {k: int(body[k]) for k in ("max_length", "min_length") if k in body}
+                future = service.summarize(body["text"], **params)
+                key = "summary"
+            elif self.path == "/classify":
+                future = service.classify(body["text"])
+                key = "prediction"
+            else:
+                self._json({"error": "not found"}, 404)
+                return
+            try:
+                self._json({key: future.result()})
+            except Exception as exc:
+                self._json({"error": str(exc)}, 500)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic-batching summarization and sentiment service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="how long a batch waits to fill (default: 10)")
+    parser.add_argument("--summarization-model", default=SUMMARIZATION_MODEL)
+    parser.add_argument("--classification-model", default=CLASSIFICATION_MODEL)
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="fp32, int8 (dynamic quantization) or onnx (ONNX Runtime) (default: $MODEL_BACKEND or fp32)")
+    args = parser.parse_args()
+
+    service = InferenceService(args.summarization_model, args.classification_model,
+                               args.max_batch_size, args.max_wait_ms / 1000, backend=args.backend)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    print(f"Serving on http://{args.host}:{args.port} (POST /summarize, POST /classify, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# long_summarize.py
+# Map-reduce summarization for documents longer than the model's input window (~1024 tokens for
+# distilbart). The document is tokenized once and cut into windows by token count, preferring to
+# end a window on a sentence boundary; the windows are summarized in batches (map), then the
+# partial summaries are packed into window-sized groups and summarized again, level by level,
+# until everything fits one window for the final summary (reduce).
+#
+# iter_summaries() yields every partial summary as its batch completes, so callers can show
+# progress on documents tens of thousands of tokens long.
+#
+# Usage: python long_summarize.py report.txt --batch-size 8
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import BACKENDS, default_backend, get_pipeline
+
+from inference_service import SUMMARIZATION_MODEL
+
+SENTENCE_END = tuple(".!?\n")
+
+
+@dataclass
+class Partial:
+    level: int          # 0 = summary of a document window, n = summary of level n-1 summaries
+    index: int
+    text: str
+    final: bool = False
+
+
+def window_size(tokenizer, max_tokens=None):
+    """Usable input tokens per call: the model window minus the special tokens added to it."""
+    limit = min(tokenizer.model_max_length, 1024) if max_tokens is None else max_tokens
+    return limit - tokenizer.num_special_tokens_to_add()
+
+
+def token_chunks(text, tokenizer, max_tokens, overlap=0):
+    """Split ``text`` into pieces of at most ``max_tokens`` tokens (as tokenized in the whole
+    document; re-tokenizing a piece can differ by a token at the edges, which truncation absorbs)."""
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    offsets = encoding["offset_mapping"]
+    if len(offsets) <= max_tokens:
+        return [text.strip()] if text.strip() else []
+    chunks = []
+    start = 0
+    while start < len(offsets):
+        end = min(start + max_tokens, len(offsets))
+        if end < len(offsets):
+            # Back up to the last sentence end in the second half of the window, if there is one.
+            for j in range(end - 1, start + max_tokens // 2, -1):
+                if text[offsets[j][0]:offsets[j][1]].rstrip(" ").endswith(SENTENCE_END):
+                    end = j + 1
+                    break
+        chunks.append(text[offsets[start][0]:offsets[end - 1][1]].strip())
+        if end == len(offsets):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def pack(texts, lengths, max_tokens):
+    """Group consecutive texts so each group's token count stays within ``max_tokens``."""
+    groups, current, total = [], [], 0
+    for text, n in zip(texts, lengths):
+        if current and total + n > max_tokens:
+            groups.append(current)
+            current, total = [], 0
+        current.append(text)
+        total += n
+    if current:
+        groups.append(current)
+    return groups
+
+
+def iter_summaries(text, summarizer, max_tokens=None, batch_size=8, overlap=0,
+                   chunk_length=(30, 120), final_length=(30, 150)):
+    """Yield a Partial for every window and group summary, ending with the final one."""
+    tokenizer = summarizer.tokenizer
+    window = window_size(tokenizer, max_tokens)
+
+    def run(texts, length):
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            with torch.inference_mode():
+                outputs = summarizer(batch, batch_size=len(batch), min_length=length[0], max_length=length[1],
+                                     do_sample=False, truncation=True)
+            for out in outputs:
+                yield out["summary_text"].strip()
+
+    parts = token_chunks(text, tokenizer, window, overlap)
+    if not parts:
+        return
+    level = 0
+    while len(parts) > 1:
+        lengths = [len(ids) for ids in tokenizer(parts, add_special_tokens=False, verbose=False)["input_ids"]]
+        groups = pack(parts, lengths, window) if level else [[p] for p in parts]
+        if level and len(groups) == len(parts):
+            # Summaries too long to share a window: pair them up and let truncation cut the rest.
+            groups = [parts[i:i + 2] for i in range(0, len(parts), 2)]
+        if len(groups) == 1:
+            parts = [" ".join(groups[0])]
+            break
+        summaries = []
+        for i, summary in enumerate(run([" ".join(g) for g in groups], chunk_length)):
+            summaries.append(summary)
+            yield Partial(level, i, summary)
+        parts = summaries
+        level += 1
+    final = next(run(parts, final_length))
+    yield Partial(level, 0, final, final=True)
+
+
+def summarize_long(text, summarizer, **kwargs):
+    """The final summary of ``text`` (see ``iter_summaries`` for the options)."""
+    final = ""
+    for partial in iter_summaries(text, summarizer, **kwargs):
+        final = partial.text
+    return final
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a document of any length.")
+    parser.add_argument("path")
+    parser.add_argument("--model", default=SUMMARIZATION_MODEL)
+    parser.add_argument("--batch-size", type=int, default=8, help="windows per summarizer call (default: 8)")
+    parser.add_argument("--max-tokens", type=int, help="input window in tokens (default: the model's, max 1024)")
+    parser.add_argument("--overlap", type=int, default=0, help="tokens shared by consecutive windows")
+    parser.add_argument("--quiet", action="store_true", help="print only the final summary")
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="fp32, int8 (dynamic quantization) or onnx (ONNX Runtime) (default: $MODEL_BACKEND or fp32)")
+    args = parser.parse_args()
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        text = f.read()
+    summarizer = get_pipeline("summarization", args.model, args.backend)
+    start = time.perf_counter()
+    for partial in iter_summaries(text, summarizer, args.max_tokens, args.batch_size, args.overlap):
+        if partial.final:
+            print(f"\nSummary ({time.perf_counter() - start:.1f}s):", partial.text)
+        elif not args.quiet:
+            print(f"[level {partial.level} #{partial.index}] {partial.text}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
-from transformers import pipeline
+import os
+import sys
+from pathlib import Path
 
-# Load summarization model
-summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import get_pipeline
+
+from inference_service import SUMMARIZATION_MODEL, ServiceClient, ServiceUnavailable
 
 text = """Photosynthesis is the process by which green plants use sunlight 
 to synthesize food from carbon dioxide and water. It involves the green pigment chlorophyll 
 and generates oxygen as a byproduct."""
 
-summary = summarizer(text, max_length=30, min_length=10, do_sample=False)
+# Use the running inference service (python inference_service.py) when there is one, so the
+# model is not reloaded on every run; otherwise load the summarization model locally.
+try:
+    summary_text = ServiceClient(os.getenv("INFERENCE_URL", "http://127.0.0.1:8002")).summarize(text, max_length=30, min_length=10)
+except ServiceUnavailable:
+    summarizer = get_pipeline("summarization", SUMMARIZATION_MODEL)
+    summary_text = summarizer(text, max_length=30, min_length=10, do_sample=False)[0]['summary_text']
 
-print("Summary:", summary[0]['summary_text'])
+print("Summary:", summary_text)
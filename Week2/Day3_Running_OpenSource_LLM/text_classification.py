@@ -1,11 +1,22 @@
-from transformers import pipeline
+import os
+import sys
+from pathlib import Path
 
-# Load a small open-source sentiment-analysis model
-classifier = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root: model_registry.py
+from model_registry import get_pipeline
+
+from inference_service import CLASSIFICATION_MODEL, ServiceClient, ServiceUnavailable
 
 # Test it
 text = "I love using Hugging Face models!"
-result = classifier(text)
+
+# Use the running inference service (python inference_service.py) when there is one; otherwise
+# load the small open-source sentiment-analysis model locally.
+try:
+    result = [ServiceClient(os.getenv("INFERENCE_URL", "http://127.0.0.1:8002")).classify(text)]
+except ServiceUnavailable:
+    classifier = get_pipeline("sentiment-analysis", CLASSIFICATION_MODEL)
+    result = classifier(text)
 
 print("Input:", text)
 print("Prediction:", result)
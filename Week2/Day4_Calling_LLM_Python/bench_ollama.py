@@ -0,0 +1,120 @@
+# bench_ollama.py
+# Load benchmark for local models: every model x concurrency level runs each prompt
+# --repetitions times through run_ollama_prompt, after --warmup untimed calls that load and pin
+# the model. Per cell it reports p50/p90/p99 latency, p50 TTFT, mean decode tokens/sec and
+# throughput (requests/s and generated tokens/s).
+#
+# Usage: python bench_ollama.py --models llama3.2 phi3 --concurrency 1 4 8 --json out.json --csv out.csv
+#        python bench_ollama.py --mock        # fake in-process server, no Ollama needed (CI)
+
+import argparse
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ollama_client import DEFAULT_URL, OllamaClient
+from run_prompt import run_ollama_prompt
+
+DEFAULT_PROMPTS = [
+    "Write a short poem about AI.",
+    "Explain what a vector database is in two sentences.",
+    "List three tips for writing clear Python code.",
+]
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 4) if len(values) else None
+
+
+def run_cell(client, model, prompts, concurrency, repetitions):
+    jobs = [p for _ in range(repetitions) for p in prompts]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda p: run_ollama_prompt(model, p, client=client, verbose=False), jobs))
+        wall = time.perf_counter() - start
+    ok = [r for r in results if r is not None]
+    latency = [r.total_s for r in ok]
+    return {
+        "model": model,
+        "concurrency": concurrency,
+        "requests": len(jobs),
+        "errors": len(jobs) - len(ok),
+        "p50_s": percentile(latency, 50),
+        "p90_s": percentile(latency, 90),
+        "p99_s": percentile(latency, 99),
+        "ttft_p50_s": percentile([r.ttft_s for r in ok], 50),
+        "ttft_p99_s": percentile([r.ttft_s for r in ok], 99),
+        "tokens_per_s": round(float(np.mean([r.tokens_per_s for r in ok])), 2) if ok else None,
+        "req_per_s": round(len(ok) / wall, 3),
+        "gen_tokens_per_s": round(sum(r.tokens for r in ok) / wall, 2),
+        "wall_s": round(wall, 3),
+    }
+
+
+def benchmark(client, models, prompts, levels, repetitions=3, warmup=2):
+    rows = []
+    for model in models:
+        client.preload(model)
+        for i in range(warmup):
+            run_ollama_prompt(model, prompts[i % len(prompts)], client=client, verbose=False)
+        for concurrency in levels:
+            row = run_cell(client, model, prompts, concurrency, repetitions)
+            rows.append(row)
+            print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+    return rows
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ollama models under concurrent load.")
+    parser.add_argument("--models", nargs="+", default=["llama3.2"])
+    parser.add_argument("--prompts", nargs="+", default=DEFAULT_PROMPTS)
+    parser.add_argument("--prompts-file", help="one prompt per line (overrides --prompts)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repetitions", type=int, default=3, help="runs of each prompt per cell (default: 3)")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls per model (default: 2)")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--mock", action="store_true", help="benchmark an in-process fake server instead")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--csv", help="write the results to this CSV file")
+    args = parser.parse_args()
+
+    prompts = args.prompts
+    if args.prompts_file:
+        with open(args.prompts_file, encoding="utf-8") as f:
+            prompts = [line.strip() for line in f if line.strip()]
+
+    url = args.url
+    server = None
+    if args.mock:
+        from fake_ollama import serve
+        server = serve(port=0, load_time=0.2, ttft=0.03, token_delay=0.005)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+    client = OllamaClient(url, pool_size=max(args.concurrency))
+    try:
+        rows = benchmark(client, args.models, prompts, args.concurrency, args.repetitions, args.warmup)
+    finally:
+        client.close()
+        if server is not None:
+            server.shutdown()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+    if args.csv and rows:
+        write_csv(rows, args.csv)
+
+
+if __name__ == "__main__":
+    main()
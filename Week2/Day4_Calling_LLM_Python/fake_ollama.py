@@ -0,0 +1,155 @@
+# fake_ollama.py
+# Stand-in for the Ollama server's /api/generate and /api/tags, for running run_prompt.py and
+# the benchmarks without a GPU or a real model.
+#   - a model "loads" (sleeps --load-time) on first use and stays loaded for its keep_alive
+#   - each token is streamed as one NDJSON line, --token-delay apart, after --ttft
+#   - the final line carries Ollama's timing fields (nanoseconds)
+#
+# Usage: python fake_ollama.py --port 11435
+#        OLLAMA_HOST=http://127.0.0.1:11435 python run_prompt.py
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("circuits hum softly in the night while patient models learn to write "
+         "of rivers stars and silicon dreams").split()
+
+
+def parse_keep_alive(value, default=300.0):
+    """Seconds from Ollama's keep_alive: a number, or a duration string like "30m"."""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for suffix in ("ms", "s", "m", "h"):
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * units[suffix]
+    return float(value)
+
+
+class FakeOllama:
+    def __init__(self, load_time=1.0, ttft=0.05, token_delay=0.01, tokens=32):
+        self.load_time = load_time
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.loaded = {}        # model -> expiry (monotonic seconds)
+        self.loads = 0
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, model, keep_alive):
+        """Returns the load time paid by this request (0 when the model was already warm)."""
+        with self._lock:
+            now = time.monotonic()
+            warm = self.loaded.get(model, 0) > now
+            if not warm:
+                self.loads += 1
+                time.sleep(self.load_time)
+            seconds = parse_keep_alive(keep_alive)
+            if seconds == 0:
+                self.loaded.pop(model, None)
+            else:
+                self.loaded[model] = float("inf") if seconds < 0 else time.monotonic() + seconds
+            return 0.0 if warm else self.load_time
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True     # small streamed lines go out immediately
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, obj, status=200):
+            data = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _line(self, obj):
+            data = json.dumps(obj).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self._json({"models": [{"name": m} for m in fake.loaded]})
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            if self.path != "/api/generate":
+                self._json({"error": "not found"}, 404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = body.get("model", "")
+            start = time.perf_counter()
+            load = fake.ensure_loaded(model, body.get("keep_alive"))
+            prompt = body.get("prompt")
+            if not prompt:
+                self._json({"model": model, "response": "", "done": True,
+                            "done_reason": "unload" if body.get("keep_alive") == 0 else "load"})
+                return
+            n = int(body.get("options", {}).get("num_predict", fake.tokens))
+            words = [WORDS[i % len(WORDS)] for i in range(max(n, 1))]
+            time.sleep(fake.ttft)
+            eval_start = time.perf_counter()
+            final = {"model": model, "response": "", "done": True, "done_reason": "stop",
+                     "prompt_eval_count": len(prompt.split()), "eval_count": len(words),
+                     "load_duration": int(load * 1e9)}
+            if not body.get("stream", True):
+                time.sleep(fake.token_delay * len(words))
+                final.update(response=" ".join(words),
+                             eval_duration=int((time.perf_counter() - eval_start) * 1e9),
+                             total_duration=int((time.perf_counter() - start) * 1e9))
+                self._json(final)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(fake.token_delay)
+                self._line({"model": model, "response": (" " if i else "") + word, "done": False})
+            final.update(eval_duration=int((time.perf_counter() - eval_start) * 1e9),
+                         total_duration=int((time.perf_counter() - start) * 1e9))
+            self._line(final)
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=11435, **kwargs):
+    """Start a fake server (port 0 picks a free one); run ``serve_forever`` in a thread."""
+    fake = FakeOllama(**kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    server.fake = fake
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--load-time", type=float, default=1.0, help="seconds to 'load' a cold model")
+    parser.add_argument("--ttft", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between tokens")
+    parser.add_argument("--tokens", type=int, default=32, help="tokens per response unless num_predict is set")
+    args = parser.parse_args()
+    server = serve(args.host, args.port, load_time=args.load_time, ttft=args.ttft,
+                   token_delay=args.token_delay, tokens=args.tokens)
+    print(f"Fake Ollama on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
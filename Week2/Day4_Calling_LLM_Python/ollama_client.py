@@ -0,0 +1,106 @@
+# ollama_client.py
+# Minimal client for the Ollama HTTP API (POST /api/generate) instead of spawning `ollama run`.
+#   - one pooled keep-alive requests.Session for every call
+#   - keep_alive pins the model in memory between prompts (no reload per call)
+#   - tokens are streamed (NDJSON) so time-to-first-token can be measured
+#
+# Usage: client = OllamaClient(); result = client.generate("llama3.2", "Write a short poem about AI.")
+#        print(result.text, result.ttft_s, result.tokens_per_s)
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_URL = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+if not DEFAULT_URL.startswith("http"):
+    DEFAULT_URL = "http://" + DEFAULT_URL
+
+
+@dataclass
+class GenerationResult:
+    model: str
+    text: str
+    ttft_s: float               # request sent -> first non-empty token
+    total_s: float              # request sent -> final message
+    tokens: int                 # generated tokens (server eval_count, else streamed chunks)
+    tokens_per_s: float         # decode speed: server eval timing, else client-side after TTFT
+    prompt_tokens: int = 0
+    load_s: float = 0.0         # time the server spent loading the model (0 when it was warm)
+    raw: dict = field(default_factory=dict, repr=False)
+
+
+class OllamaClient:
+    def __init__(self, base_url=DEFAULT_URL, keep_alive="30m", timeout=300, pool_size=16):
+        self.base_url = base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, path, payload, stream=False):
+        response = self.session.post(self.base_url + path, json=payload, stream=stream, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def preload(self, model):
+        """Load ``model`` and pin it for ``keep_alive`` (a generate call without a prompt)."""
+        self._post("/api/generate", {"model": model, "keep_alive": self.keep_alive}).json()
+
+    def unload(self, model):
+        self._post("/api/generate", {"model": model, "keep_alive": 0}).json()
+
+    def generate(self, model, prompt, options=None, on_token: Optional[Callable[[str], None]] = None):
+        """Stream one completion; ``on_token`` is called with each text fragment as it arrives."""
+        payload = {"model": model, "prompt": prompt, "stream": True, "keep_alive": self.keep_alive}
+        if options:
+            payload["options"] = options
+        parts = []
+        first = None
+        final = {}
+        start = time.perf_counter()
+        with self._post("/api/generate", payload, stream=True) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise RuntimeError(f"Ollama error: {message['error']}")
+                piece = message.get("response", "")
+                if piece:
+                    if first is None:
+                        first = time.perf_counter()
+                    parts.append(piece)
+                    if on_token is not None:
+                        on_token(piece)
+                if message.get("done"):
+                    # Keep reading to the end of the body so the connection goes back to the pool.
+                    final = message
+        end = time.perf_counter()
+        first = end if first is None else first
+
+        tokens = final.get("eval_count", len(parts))
+        if final.get("eval_duration"):
+            tokens_per_s = tokens / (final["eval_duration"] / 1e9)
+        else:
+            tokens_per_s = (len(parts) - 1) / (end - first) if len(parts) > 1 and end > first else 0.0
+        return GenerationResult(
+            model=model,
+            text="".join(parts),
+            ttft_s=first - start,
+            total_s=end - start,
+            tokens=tokens,
+            tokens_per_s=tokens_per_s,
+            prompt_tokens=final.get("prompt_eval_count", 0),
+            load_s=final.get("load_duration", 0) / 1e9,
+            raw=final,
+        )
+
+    def close(self):
+        self.session.close()
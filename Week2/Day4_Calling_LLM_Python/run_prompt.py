@@ -1,24 +1,38 @@
-import subprocess
-import time
+import requests
 
-def run_ollama_prompt(model="llama3.2", prompt="Write a short poem about AI."):
+from ollama_client import OllamaClient
+
+# One pooled keep-alive session for the whole process; the model stays pinned between prompts.
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = OllamaClient()
+    return _client
+
+
+def run_ollama_prompt(model="llama3.2", prompt="Write a short poem about AI.", client=None, verbose=True):
+    """Stream one prompt through the Ollama HTTP API. Returns the GenerationResult (None on error)."""
+    client = client or get_client()
     try:
-        start = time.time()
-        # Run ollama command
-        result = subprocess.run(
-            ["ollama", "run", model, prompt],
-            capture_output=True, text=True, check=True
-        )
-        end = time.time()
-        response_time = end - start
-
-        print("=== Model Response ===")
-        print(result.stdout.strip())
-        print("\n=== Stats ===")
-        print(f"Response Time: {response_time:.2f} seconds")
-
-    except subprocess.CalledProcessError as e:
-        print("Error running Ollama:", e.stderr)
+        if verbose:
+            print("=== Model Response ===")
+        result = client.generate(model, prompt, on_token=(lambda t: print(t, end="", flush=True)) if verbose else None)
+        if verbose:
+            print("\n\n=== Stats ===")
+            print(f"Time to first token: {result.ttft_s:.2f} seconds")
+            print(f"Tokens/sec: {result.tokens_per_s:.1f} ({result.tokens} tokens)")
+            print(f"Response Time: {result.total_s:.2f} seconds")
+            if result.load_s:
+                print(f"Model load: {result.load_s:.2f} seconds")
+        return result
+
+    except (requests.RequestException, RuntimeError) as e:
+        print("Error running Ollama:", e)
+        return None
+
 
 if __name__ == "__main__":
     run_ollama_prompt()
@@ -1,6 +1,9 @@
+from contextlib import closing
+
 import streamlit as st
 from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
+
+from chat_backend import ChatSession
 
 st.set_page_config(page_title="Mini LLM Chat", page_icon="🤖")
 
@@ -15,6 +18,9 @@ tokenizer, model = load_model()
 
 if "messages" not in st.session_state:
     st.session_state["messages"] = []
+if "chat" not in st.session_state:
+    # Per-visitor transcript and key/value cache; the model itself is shared (cache_resource).
+    st.session_state["chat"] = ChatSession(tokenizer, model, max_new_tokens=120, temperature=0.7)
 
 for msg in st.session_state["messages"]:
     with st.chat_message(msg["role"]):
@@ -27,15 +33,10 @@ if prompt := st.chat_input("Type your message..."):
 
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
-        inputs = tokenizer.encode(prompt, return_tensors="pt")
-        outputs = model.generate(
-            inputs,
-            max_new_tokens=120,
-            do_sample=True,
-            temperature=0.7,
-            pad_token_id=tokenizer.eos_token_id
-        )
-        reply = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        reply = reply[len(prompt):].strip()
+        reply = ""
+        # closing() ends generation and unlocks the session if Streamlit interrupts this run.
+        with closing(st.session_state["chat"].stream(prompt)) as replies:
+            for reply in replies:
+                message_placeholder.markdown(reply + "▌")
         message_placeholder.markdown(reply)
         st.session_state["messages"].append({"role": "assistant", "content": reply})
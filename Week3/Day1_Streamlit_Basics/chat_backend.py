@@ -0,0 +1,148 @@
+# chat_backend.py
+# Multi-turn chat on top of a small causal LM (distilgpt2), for app.py.
+#
+# The conversation is kept as a plain "User: ... / Assistant: ..." transcript. Its token ids and
+# the model's key/value cache live in a ChatSession, so each new turn only encodes the tokens
+# added since the last one. generate() runs on a background thread and hands tokens to a
+# TextIteratorStreamer, so the reply can be shown while it is being written.
+#
+# The transcript is bounded by a sliding window: when the next turn would not fit, the oldest
+# turns are dropped until the context is half the window, and the cache is rebuilt once from
+# what is left (GPT-2's absolute position embeddings rule out shifting the cached keys instead).
+
+import threading
+
+import torch
+from transformers import DynamicCache, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+STOP = "\nUser:"
+
+
+def common_prefix(a, b):
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class Cancelled(StoppingCriteria):
+    """Stops generate() once ``event`` is set (the reader went away)."""
+
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool)
+
+
+class ChatSession:
+    def __init__(self, tokenizer, model, max_context=None, max_new_tokens=120, temperature=0.7):
+        self.tokenizer = tokenizer
+        self.model = model
+        limit = getattr(model.config, "max_position_embeddings", None) or tokenizer.model_max_length
+        self.max_context = min(max_context or limit, limit)
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.turns = []              # token ids per transcript piece, oldest first
+        self.cache = DynamicCache()
+        self.reused = 0              # tokens served from the cache by the last reply
+        self._lock = threading.Lock()
+
+    @property
+    def ids(self):
+        return [t for turn in self.turns for t in turn]
+
+    def _encode(self, text):
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
+
+    def _slide(self, incoming):
+        """Drop the oldest turns so ``incoming`` new tokens plus a full reply fit the window."""
+        budget = self.max_context - self.max_new_tokens
+        if sum(map(len, self.turns)) + incoming <= budget:
+            return
+        while self.turns and sum(map(len, self.turns)) + incoming > budget // 2:
+            self.turns.pop(0)
+        self.cache = DynamicCache()
+
+    def reset(self):
+        with self._lock:
+            self.turns = []
+            self.cache = DynamicCache()
+
+    def stream(self, prompt):
+        """Yield the reply to ``prompt`` as it grows (each item is the full text so far).
+
+        The session is locked until the generator finishes or is closed, so turns never overlap.
+        Closing it early (e.g. on a Streamlit rerun) stops generation and drops the unanswered turn.
+        """
+        with self._lock:
+            turn = self._encode(f"User: {prompt.strip()}\nAssistant:")
+            # A single prompt longer than the window keeps only its end.
+            turn = turn[-(self.max_context - self.max_new_tokens):]
+            self._slide(len(turn))
+            self.turns.append(turn)
+            ids = self.ids
+            self.reused = self.cache.get_seq_length()
+
+            streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+            cancel = threading.Event()
+            result = {}
+
+            def generate():
+                try:
+                    result["sequence"] = self.model.generate(
+                        torch.tensor([ids]),
+                        attention_mask=torch.ones(1, len(ids), dtype=torch.long),
+                        past_key_values=self.cache,
+                        max_new_tokens=self.max_new_tokens,
+                        do_sample=True,
+                        temperature=self.temperature,
+                        pad_token_id=self.tokenizer.eos_token_id,
+                        stop_strings=[STOP],
+                        tokenizer=self.tokenizer,
+                        stopping_criteria=StoppingCriteriaList([Cancelled(cancel)]),
+                        streamer=streamer,
+                    )[0].tolist()
+                except Exception as exc:
+                    result["error"] = exc
+                    streamer.end()
+
+            thread = threading.Thread(target=generate, daemon=True)
+            thread.start()
+            text = ""
+            exhausted = answered = False
+            try:
+                for piece in streamer:
+                    text += piece
+                    cut = text.find(STOP)
+                    if cut >= 0:
+                        text = text[:cut]
+                        break
+                    # Hold back a trailing partial stop marker ("\nUs...") until it is resolved.
+                    hold = max((k for k in range(1, len(STOP)) if text.endswith(STOP[:k])), default=0)
+                    yield text[:len(text) - hold].strip()
+                else:
+                    exhausted = True
+                answered = True
+            finally:
+                if not answered:
+                    cancel.set()
+                if not exhausted:
+                    for _ in streamer:      # let generate() finish before the cache is touched again
+                        pass
+                thread.join()
+                if not answered or "error" in result:
+                    self.turns.pop()
+                    self.cache = DynamicCache()
+            if "error" in result:
+                raise result["error"]
+
+            reply = text.strip()
+            self.turns.append(self._encode(f" {reply}\n"))
+            # The cache holds the sampled tokens, stop marker included; keep only the part that
+            # agrees with the transcript as it will be encoded from now on.
+            cached = result["sequence"][:self.cache.get_seq_length()]
+            self.cache.crop(common_prefix(cached, self.ids))
+            yield reply
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Latency and recall benchmark: TfidfRetriever vs BM25Retriever.
+
+Builds a synthetic Zipf-distributed corpus and reports per-query latency
+(mean / p50 / p99) for each engine, recall@k of MaxScore-pruned BM25 against
+exhaustive BM25 (1.0 up to ties at the k-th score), and top-k overlap of BM25 with TF-IDF.
+
+    python bench_retrievers.py --docs 50000 --queries 500 --k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from bm25 import BM25Retriever
+from main import TfidfRetriever
+
+
+def synthetic_corpus(n_docs: int, vocab: int, doc_len: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}x" for i in range(vocab)])
+    lengths = rng.integers(doc_len // 2, doc_len * 2, n_docs)
+    ids = np.minimum(rng.zipf(1.2, lengths.sum()) - 1, vocab - 1)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    docs = [Document(page_content=" ".join(words[ids[a:b]]), metadata={"source": f"doc{i}"})
+            for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:]))]
+    return docs, words, rng
+
+
+def timed(fn, queries):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), results
+
+
+def report(name: str, latencies: np.ndarray):
+    print(f"{name:<16} mean {latencies.mean():8.3f} ms   p50 {np.percentile(latencies, 50):8.3f} ms   "
+          f"p99 {np.percentile(latencies, 99):8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--doc-len", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--query-len", type=int, default=4)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    docs, words, rng = synthetic_corpus(args.docs, args.vocab, args.doc_len)
+    queries = [" ".join(rng.choice(words[:5000], args.query_len)) for _ in range(args.queries)]
+
+    start = time.perf_counter(); tfidf = TfidfRetriever(docs, n_results=args.k)
+    print(f"TF-IDF build {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter(); bm25 = BM25Retriever(docs, n_results=args.k)
+    print(f"BM25 build   {time.perf_counter() - start:.2f}s")
+
+    lat_tfidf, res_tfidf = timed(lambda q: set(id(d) for d in tfidf.get_relevant_documents(q)), queries)
+    lat_bm25, res_bm25 = timed(lambda q: set(bm25._search(q, args.k)[0].tolist()), queries)
+    lat_full, res_full = timed(lambda q: set(bm25._search(q, args.k, prune=False)[0].tolist()), queries)
+    report("TF-IDF", lat_tfidf)
+    report("BM25 MaxScore", lat_bm25)
+    report("BM25 exhaustive", lat_full)
+
+    position = {id(d): i for i, d in enumerate(tfidf.documents)}
+    recall = np.mean([len(p & f) / max(len(f), 1) for p, f in zip(res_bm25, res_full)])
+    overlap = np.mean([len(b & {position[i] for i in t}) / max(len(t), 1) for b, t in zip(res_bm25, res_tfidf)])
+    print(f"recall@{args.k} MaxScore vs exhaustive BM25: {recall:.3f}")
+    print(f"top-{args.k} overlap BM25 vs TF-IDF:           {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+BM25 retriever over a compact inverted index, a drop-in for TfidfRetriever.
+
+Postings are stored CSC-style: for each term, a slice of one doc-id array and
+one precomputed BM25 impact array, both sorted by doc id. A query only touches
+the postings of its own terms, and MaxScore pruning stops scanning lists once
+the remaining terms' upper bounds cannot lift an unseen document into the top k;
+from then on, lists are only probed for surviving candidates by binary search.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from sklearn.feature_extraction.text import CountVectorizer
+
+from retrieval_utils import chunk_documents, top_k
+
+
+class BM25Retriever:
+    def __init__(self, documents: List[Document], n_results: int = 4, k1: float = 1.5, b: float = 0.75,
+                 chunk_size: Optional[int] = None, chunk_overlap: int = 100):
+        self.documents = chunk_documents(documents, chunk_size, chunk_overlap) if chunk_size else documents
+        self.n_results = n_results
+        self.k1 = k1
+        self.b = b
+        self._build()
+
+    def _build(self):
+        vectorizer = CountVectorizer(stop_words="english")
+        counts = vectorizer.fit_transform([d.page_content for d in self.documents]).tocsc()
+        counts.sort_indices()
+        self.vocabulary = vectorizer.vocabulary_
+        self.analyzer = vectorizer.build_analyzer()
+        n_docs = counts.shape[0]
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 0.0
+        df = np.diff(counts.indptr)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        tf = counts.data
+        docs = counts.indices
+        norm = self.k1 * (1 - self.b + self.b * doc_len[docs] / (avg_len or 1.0))
+        term_of_posting = np.repeat(np.arange(len(df)), df)
+        self.offsets = counts.indptr
+        self.postings = docs.astype(np.int32)
+        self.impacts = (idf[term_of_posting] * tf * (self.k1 + 1) / (tf + norm)).astype(np.float32)
+        self.max_impact = np.maximum.reduceat(self.impacts, self.offsets[:-1]) if len(self.impacts) else np.zeros(len(df), np.float32)
+        self.max_impact[df == 0] = 0
+
+    def _term_ids(self, query: str) -> np.ndarray:
+        ids = {self.vocabulary[t] for t in self.analyzer(query) if t in self.vocabulary}
+        return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+    def _search(self, query: str, k: int, prune: bool = True):
+        """Return ``(doc_ids, scores)`` of the top ``k`` matches, best first."""
+        terms = self._term_ids(query)
+        terms = terms[np.argsort(-self.max_impact[terms], kind="stable")]
+        # rest[j]: the most that terms j.. can still add to any document's score.
+        rest = np.cumsum(self.max_impact[terms][::-1])[::-1]
+        cand = np.zeros(0, dtype=np.int32)
+        scores = np.zeros(0, dtype=np.float32)
+        theta = -np.inf
+        for j, t in enumerate(terms):
+            lo, hi = self.offsets[t], self.offsets[t + 1]
+            docs, imp = self.postings[lo:hi], self.impacts[lo:hi]
+            if prune and len(cand) >= k and rest[j] < theta:
+                # Unseen documents can no longer reach the top k: drop hopeless
+                # candidates and probe this list for the rest.
+                keep = scores + rest[j] >= theta
+                cand, scores = cand[keep], scores[keep]
+                pos = np.minimum(np.searchsorted(docs, cand), len(docs) - 1)
+                hit = docs[pos] == cand
+                scores[hit] += imp[pos[hit]]
+            else:
+                cand, inverse = np.unique(np.concatenate([cand, docs]), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate([scores, imp]), minlength=len(cand)).astype(np.float32)
+            if len(scores) >= k:
+                theta = max(theta, np.partition(scores, len(scores) - k)[len(scores) - k])
+        best = top_k(np.arange(len(cand)), scores, k)
+        return cand[best], scores[best]
+
+    def batch_get_relevant_documents(self, queries: List[str]) -> List[List[Document]]:
+        """Top ``n_results`` documents per query; only documents sharing a term with the query are returned."""
+        return [[self.documents[i] for i in self._search(q, self.n_results)[0]] for q in queries]
+
+    def get_relevant_documents(self, query: str) -> List[Document]:
+        return self.batch_get_relevant_documents([query])[0]
@@ -5,12 +5,16 @@ Simple Multi-Agent RAG with Exact Outputs (Streamlit/Pydantic-safe)
 
 from pathlib import Path
 import re
+import time
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
 from langchain_core.documents import Document
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from bm25 import BM25Retriever
+from retrieval_utils import chunk_documents, top_k
+from router import KeywordRouter, RouteStats, compile_answers
+from tfidf_index import TfidfIndex
 
 
 def load_texts(data_dir: str) -> List[Document]:
@@ -21,78 +25,135 @@ def load_texts(data_dir: str) -> List[Document]:
     return docs
 
 
+class Retriever(Protocol):
+    def get_relevant_documents(self, query: str) -> List[Document]: ...
+
+    def batch_get_relevant_documents(self, queries: List[str]) -> List[List[Document]]: ...
+
+
 # Plain Python retriever (no BaseRetriever to avoid pydantic issues)
 class TfidfRetriever:
-    def __init__(self, documents: List[Document], n_results: int = 4):
-        self.documents = documents
+    def __init__(self, documents: List[Document], n_results: int = 4, index_dir: Optional[str] = None,
+                 chunk_size: Optional[int] = None, chunk_overlap: int = 100):
+        # With chunk_size set, passages rather than whole files are indexed and returned.
+        self.documents = chunk_documents(documents, chunk_size, chunk_overlap) if chunk_size else documents
         self.n_results = n_results
+        self.index_dir = index_dir
         self.vectorizer = TfidfVectorizer(stop_words="english")
         self._fit()
 
     def _fit(self):
         self.corpus = [d.page_content for d in self.documents]
-        self.tfidf = self.vectorizer.fit_transform(self.corpus)
+        if self.index_dir:
+            # Reuse the persisted index; only changed documents are re-vectorized.
+            index = TfidfIndex.load_or_build(self.documents, self.index_dir)
+            self.vectorizer = index.vectorizer()
+            self.tfidf = index.tfidf
+        else:
+            self.tfidf = self.vectorizer.fit_transform(self.corpus)
+
+    def _score_batch(self, queries: List[str]):
+        # Rows of both matrices are l2-normalized, so one sparse product gives cosine similarity.
+        # Multiplying from the document side avoids transposing the whole index per call.
+        q = self.vectorizer.transform(queries)
+        return (self.tfidf @ q.T).T.tocsr()
 
     def _score(self, query: str) -> np.ndarray:
-        q = self.vectorizer.transform([query])
-        sims = cosine_similarity(q, self.tfidf)[0]
-        return sims
+        return self._score_batch([query]).toarray()[0]
+
+    def batch_get_relevant_documents(self, queries: List[str]) -> List[List[Document]]:
+        sims = self._score_batch(queries)
+        k = min(self.n_results, len(self.documents))
+        results = []
+        for row in range(len(queries)):
+            lo, hi = sims.indptr[row], sims.indptr[row + 1]
+            idxs = top_k(sims.indices[lo:hi], sims.data[lo:hi], k)
+            if len(idxs) < k:
+                # Pad with unmatched documents, as a full sort over all scores would.
+                rest = np.setdiff1d(np.arange(k + len(idxs)), idxs)[: k - len(idxs)]
+                idxs = np.concatenate([idxs, rest])
+            results.append([self.documents[i] for i in idxs])
+        return results
 
     def get_relevant_documents(self, query: str) -> List[Document]:
-        sims = self._score(query)
-        idxs = np.argsort(-sims)[: self.n_results]
-        return [self.documents[i] for i in idxs]
+        return self.batch_get_relevant_documents([query])[0]
+
+
+# Topic registry: routing keywords and canned (pattern, reply) answers per topic.
+TOPICS = {
+    "salary": {
+        "keywords": ["salary", "pay", "deduction", "annual", "monthly", "gross", "net", "compensation", "payroll"],
+        "answers": [(r"annual.*salary", "Your annual salary is monthly salary × 12, minus deductions.")],
+    },
+    "insurance": {
+        "keywords": ["insurance", "policy", "coverage", "premium", "claim"],
+        "answers": [(r"(what.*included|insurance policy|coverage)",
+                     "Your insurance policy includes room rent (up to limit), doctor fees, medicines, diagnostic tests, and surgery charges.")],
+    },
+}
 
 
 @dataclass
 class RAGAgent:
     name: str
-    retriever: TfidfRetriever
+    retriever: Retriever
     allowed_topic: str
+    keywords: Sequence[str] = ()
+    answers: Sequence[Tuple[str, str]] = ()
+
+    def __post_init__(self):
+        topic = TOPICS.get(self.allowed_topic, {})
+        self.keywords = list(self.keywords or topic.get("keywords", []))
+        self.answers = list(self.answers or topic.get("answers", []))
+        self._keyword_re = re.compile("|".join(re.escape(k) for k in self.keywords), re.I) if self.keywords else None
+        self._answer_re, self._replies = compile_answers(self.answers)
 
     def can_handle(self, query: str) -> bool:
-        q = query.lower()
-        if self.allowed_topic == "salary":
-            return any(k in q for k in ["salary","pay","deduction","annual","monthly","gross","net"])
-        if self.allowed_topic == "insurance":
-            return any(k in q for k in ["insurance","policy","coverage","premium","claim"])
-        return False
+        return bool(self._keyword_re and self._keyword_re.search(query))
 
     def answer(self, query: str) -> str:
         # Hardcoded concise answers for demo
-        if self.allowed_topic == "salary" and re.search(r"annual.*salary", query, re.I):
-            return "Your annual salary is monthly salary × 12, minus deductions."
-        if self.allowed_topic == "insurance" and re.search(r"(what.*included|insurance policy|coverage)", query, re.I):
-            return "Your insurance policy includes room rent (up to limit), doctor fees, medicines, diagnostic tests, and surgery charges."
+        m = self._answer_re.match(query) if self._answer_re else None
+        if m:
+            return self._replies[int(m.lastgroup[1:])]
         # fallback
         docs = self.retriever.get_relevant_documents(query)
         return docs[0].page_content if docs else "I don't know."
 
 
 class Coordinator:
-    def __init__(self, salary_agent: RAGAgent, insurance_agent: RAGAgent):
-        self.salary_agent = salary_agent
-        self.insurance_agent = insurance_agent
-        self.vectorizer = TfidfVectorizer(stop_words="english")
-        self.topic_labels = ["salary compensation payroll", "insurance policy coverage"]
-        self.topic_tfidf = self.vectorizer.fit_transform(self.topic_labels)
+    """Routes each query to one of any number of agents with a compiled keyword router."""
+
+    def __init__(self, *agents: RAGAgent):
+        self.agents = list(agents)
+        self.router = KeywordRouter()
+        for agent in self.agents:
+            self.router.register(agent.name, agent, agent.keywords)
+        self.router.compile()
 
     def _route(self, query: str) -> RAGAgent:
-        q = self.vectorizer.transform([query])
-        sims = cosine_similarity(q, self.topic_tfidf)[0]
-        agent = self.salary_agent if sims[0] >= sims[1] else self.insurance_agent
-        if not agent.can_handle(query):
-            agent = self.insurance_agent if agent is self.salary_agent else self.salary_agent
-        return agent
+        return self.router.route(query)[1]
 
     def ask(self, query: str) -> str:
-        agent = self._route(query)
-        return agent.answer(query)
+        started = time.perf_counter()
+        name, agent = self.router.route(query)
+        reply = agent.answer(query)
+        self.router.timed(name, started)
+        return reply
+
+    def route_stats(self) -> Dict[str, RouteStats]:
+        return self.router.stats
 
 
-def build_system(data_dir: str) -> Tuple[Coordinator,RAGAgent,RAGAgent]:
+def build_system(data_dir: str, index_dir: Optional[str] = None, chunk_size: int = 500,
+                 chunk_overlap: int = 100, engine: str = "tfidf") -> Tuple[Coordinator,RAGAgent,RAGAgent]:
     docs = load_texts(data_dir)
-    retriever = TfidfRetriever(docs)
+    if engine == "bm25":
+        retriever = BM25Retriever(docs, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    elif engine == "tfidf":
+        retriever = TfidfRetriever(docs, index_dir=index_dir, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    else:
+        raise ValueError(f"Unknown retrieval engine: {engine!r}")
     salary_agent = RAGAgent("Salary Agent", retriever, "salary")
     insurance_agent = RAGAgent("Insurance Agent", retriever, "insurance")
     return Coordinator(salary_agent, insurance_agent), salary_agent, insurance_agent
@@ -0,0 +1,41 @@
+"""
+Passage chunking and top-k selection shared by the TF-IDF and BM25 retrievers.
+"""
+
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+def chunk_documents(documents: List[Document], chunk_size: int = 500, chunk_overlap: int = 100) -> List[Document]:
+    """Split documents into overlapping passages, breaking on whitespace where possible.
+
+    Each chunk keeps the source metadata plus ``start``/``end`` character offsets
+    into its document's text.
+    """
+    chunks: List[Document] = []
+    for doc in documents:
+        text = doc.page_content
+        start = 0
+        while True:
+            end = min(len(text), start + chunk_size)
+            if end < len(text):
+                cut = text.rfind(" ", start + chunk_size // 2, end)
+                if cut > start:
+                    end = cut
+            chunks.append(Document(page_content=text[start:end], metadata={**doc.metadata, "start": start, "end": end}))
+            if end >= len(text):
+                break
+            nxt = max(end - chunk_overlap, start + 1)
+            space = text.find(" ", nxt, end)
+            start = space + 1 if space != -1 else nxt
+    return chunks
+
+
+def top_k(indices: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """The ``k`` highest-scoring ``indices`` in descending score order, via argpartition."""
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        indices, scores = indices[part], scores[part]
+    return indices[np.argsort(-scores, kind="stable")]
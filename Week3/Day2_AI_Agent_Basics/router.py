@@ -0,0 +1,87 @@
+"""
+Registry-based keyword router compiled into a single regex.
+
+Every registered route contributes keywords; all of them are compiled into one
+case-insensitive alternation wrapped in a lookahead, so a single ``finditer``
+pass sees every keyword occurrence (substring semantics, like ``k in query``).
+Longest-first ordering means a match at a position also implies all of its
+keyword prefixes, which are folded in through a precomputed prefix closure.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_seconds / self.count * 1000 if self.count else 0.0
+
+
+def compile_answers(answers: Sequence[Tuple[str, str]]) -> Tuple[Optional[re.Pattern], List[str]]:
+    """One regex with a named group per ``(pattern, reply)``; the first listed pattern wins."""
+    if not answers:
+        return None, []
+    # A lookahead per alternative keeps each pattern free to match anywhere in the query,
+    # as an independent re.search would, while earlier patterns keep priority.
+    parts = [f"(?=[\\s\\S]*?(?P<a{i}>{pattern}))" for i, (pattern, _) in enumerate(answers)]
+    return re.compile("^(?:" + "|".join(parts) + ")", re.I), [reply for _, reply in answers]
+
+
+@dataclass
+class KeywordRouter:
+    routes: Dict[str, Any] = field(default_factory=dict)
+    keywords: Dict[str, Sequence[str]] = field(default_factory=dict)
+    stats: Dict[str, RouteStats] = field(default_factory=dict)
+    _pattern: Optional[re.Pattern] = None
+    _topics: Dict[str, List[str]] = field(default_factory=dict)
+
+    def register(self, name: str, target: Any, keywords: Sequence[str]):
+        self.routes[name] = target
+        self.keywords[name] = [k.lower() for k in keywords]
+        self.stats[name] = RouteStats()
+        self._pattern = None
+
+    def compile(self):
+        owners: Dict[str, List[str]] = {}
+        for name, words in self.keywords.items():
+            for w in words:
+                owners.setdefault(w, [])
+                if name not in owners[w]:
+                    owners[w].append(name)
+        # Each keyword also counts for every shorter keyword that is its prefix.
+        self._topics = {w: [n for p in owners if w.startswith(p) for n in owners[p]] for w in owners}
+        alternation = "|".join(re.escape(w) for w in sorted(owners, key=len, reverse=True))
+        self._pattern = re.compile(f"(?=({alternation}))", re.I) if owners else None
+
+    def hits(self, query: str) -> Dict[str, int]:
+        """Keyword occurrences per route, from one scan of ``query``."""
+        if self._pattern is None:
+            self.compile()
+        counts = dict.fromkeys(self.routes, 0)
+        if self._pattern is not None:
+            for m in self._pattern.finditer(query):
+                for name in self._topics[m.group(1).lower()]:
+                    counts[name] += 1
+        return counts
+
+    def route(self, query: str) -> Tuple[str, Any]:
+        """The route with the most keyword hits; ties and misses go to the first registered."""
+        counts = self.hits(query)
+        name = max(counts, key=counts.get)
+        return name, self.routes[name]
+
+    def timed(self, name: str, started: float):
+        self.stats[name].record(time.perf_counter() - started)
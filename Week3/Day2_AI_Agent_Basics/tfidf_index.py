@@ -0,0 +1,137 @@
+"""
+Persistent TF-IDF index for TfidfRetriever.
+
+The index directory holds the vocabulary, IDF weights, the raw term-count and
+normalized TF-IDF matrices as CSR component ``.npy`` files, and a manifest of
+``(source, sha256)`` per document row. Loading memory-maps the arrays, and
+``update`` re-tokenizes only documents whose content hash changed.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from scipy.sparse import csr_matrix, vstack
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+INDEX_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _save_csr(index_dir: Path, name: str, m: csr_matrix):
+    for part in ("data", "indices", "indptr"):
+        np.save(index_dir / f"{name}_{part}.npy", getattr(m, part))
+
+
+def _load_csr(index_dir: Path, name: str, shape, mmap: bool) -> csr_matrix:
+    mode = "r" if mmap else None
+    parts = [np.load(index_dir / f"{name}_{p}.npy", mmap_mode=mode) for p in ("data", "indices", "indptr")]
+    return csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+@dataclass
+class TfidfIndex:
+    vocabulary: Dict[str, int]
+    counts: csr_matrix
+    manifest: List[dict]
+    idf: np.ndarray = field(default=None)
+    tfidf: csr_matrix = field(default=None)
+
+    def __post_init__(self):
+        if self.idf is None or self.tfidf is None:
+            self._weight()
+
+    def _weight(self):
+        # Same smoothed IDF and l2 normalization as TfidfVectorizer's defaults.
+        n_docs = self.counts.shape[0]
+        df = np.bincount(self.counts.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + n_docs) / (1 + df)) + 1
+        self.tfidf = normalize(self.counts.multiply(self.idf).tocsr())
+
+    @staticmethod
+    def _analyzer():
+        return TfidfVectorizer(stop_words="english").build_analyzer()
+
+    @classmethod
+    def build(cls, documents: List[Document]) -> "TfidfIndex":
+        return cls({}, csr_matrix((0, 0)), [], idf=np.zeros(0), tfidf=csr_matrix((0, 0))).update(documents)
+
+    def vectorizer(self) -> TfidfVectorizer:
+        """A TfidfVectorizer that transforms queries into this index's space without refitting."""
+        vec = TfidfVectorizer(stop_words="english", vocabulary=self.vocabulary)
+        vec.idf_ = self.idf
+        return vec
+
+    def update(self, documents: List[Document]) -> "TfidfIndex":
+        """Return an index for ``documents``, reusing count rows whose content hash is unchanged."""
+        old_rows = {(e["source"], e["sha256"]): i for i, e in enumerate(self.manifest)}
+        manifest = [{"source": d.metadata.get("source"), "sha256": content_hash(d.page_content)} for d in documents]
+        if manifest == self.manifest:
+            return self
+        vocabulary = dict(self.vocabulary)
+        analyze = self._analyzer()
+        rows = []
+        for doc, entry in zip(documents, manifest):
+            i = old_rows.get((entry["source"], entry["sha256"]))
+            if i is not None:
+                rows.append(self.counts[i])
+                continue
+            terms = [vocabulary.setdefault(t, len(vocabulary)) for t in analyze(doc.page_content)]
+            cols, tf = np.unique(np.asarray(terms, dtype=np.int64), return_counts=True)
+            rows.append(csr_matrix((tf.astype(np.float64), cols, [0, len(cols)]), shape=(1, len(vocabulary))))
+        width = len(vocabulary)
+        counts = vstack([csr_matrix((r.data, r.indices, r.indptr), shape=(1, width)) for r in rows], format="csr") if rows else csr_matrix((0, width))
+        # Drop terms that no longer occur in any document, as a fresh fit would.
+        used = np.bincount(counts.indices, minlength=width) > 0
+        if not used.all():
+            remap = np.cumsum(used) - 1
+            vocabulary = {t: int(remap[c]) for t, c in vocabulary.items() if used[c]}
+            counts = counts[:, np.flatnonzero(used)].tocsr()
+        return TfidfIndex(vocabulary, counts, manifest)
+
+    def save(self, index_dir: str):
+        path = Path(index_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        _save_csr(path, "counts", self.counts)
+        _save_csr(path, "tfidf", self.tfidf)
+        np.save(path / "idf.npy", self.idf)
+        (path / "vocabulary.json").write_text(json.dumps(self.vocabulary), encoding="utf-8")
+        meta = {"version": INDEX_VERSION, "shape": list(self.counts.shape), "documents": self.manifest}
+        (path / "manifest.json").write_text(json.dumps(meta, indent=1), encoding="utf-8")
+
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = True) -> Optional["TfidfIndex"]:
+        """Load a saved index, memory-mapping its arrays; ``None`` if missing or from another version."""
+        path = Path(index_dir)
+        try:
+            meta = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        shape = tuple(meta["shape"])
+        vocabulary = json.loads((path / "vocabulary.json").read_text(encoding="utf-8"))
+        return cls(
+            vocabulary,
+            _load_csr(path, "counts", shape, mmap),
+            meta["documents"],
+            idf=np.load(path / "idf.npy", mmap_mode="r" if mmap else None),
+            tfidf=_load_csr(path, "tfidf", shape, mmap),
+        )
+
+    @classmethod
+    def load_or_build(cls, documents: List[Document], index_dir: str) -> "TfidfIndex":
+        """Load the index in ``index_dir``, refresh it for ``documents`` and save it if anything changed."""
+        index = cls.load(index_dir)
+        updated = index.update(documents) if index is not None else cls.build(documents)
+        if updated is not index:
+            updated.save(index_dir)
+        return updated
@@ -3,6 +3,9 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import io
+from matplotlib.figure import Figure
+from loanlab import (CHART_CACHE, DEFAULT_RATE_SHOCKS, DEFAULT_TERMS, EXPORT_CACHE, SCHEDULE_CACHE, cached_chart, cached_schedule, calc_irr, calc_npv,
+                     export_schedules, irr, loan_key, monthly_equivalent, rate_term_grid, risk_band, schedule_cashflows, stack_cashflows)
 
 st.set_page_config(page_title='LoanLab — Advanced Loan Calculator', page_icon='💸', layout='wide')
 
@@ -28,59 +31,11 @@ if st.session_state.dark:
     st.markdown("<style>body {background-color:#0f1724; color:white}</style>", unsafe_allow_html=True)
 
 # Helpers
-def payment_amount(P, r_annual, n_years, m_payments):
-    n = int(round(n_years * m_payments))
-    if n == 0: return 0.0, 0
-    r = (r_annual/100.0)/m_payments
-    if r == 0: return P/n, n
-    A = P * (r * (1+r)**n) / ((1+r)**n - 1)
-    return A, n
-
-def amort_schedule(P, r_annual, n_years, m_payments, extra=0.0, prepay=None, variable_rates=None):
-    rows=[]; balance=P; k=0; total_interest=0.0
-    rates = None
-    if variable_rates:
-        rates=[] 
-        for periods_count, rate in variable_rates:
-            rates += [rate]*periods_count
-    max_iter=200000
-    while balance>1e-6 and k<max_iter:
-        k+=1
-        if rates:
-            r_annual = rates[k-1] if k-1<len(rates) else rates[-1]
-        r = (r_annual/100.0)/m_payments
-        A, _ = payment_amount(balance, r_annual, 1.0, m_payments)
-        interest = balance * r
-        principal = min(balance, A - interest + extra)
-        balance = max(0.0, balance - principal)
-        prepay_now=0.0
-        if prepay and k==prepay[0]:
-            prepay_now = min(balance, prepay[1]); balance = max(0.0, balance - prepay_now)
-        total_interest += interest
-        rows.append({'Payment #':k,'Payment':round(A,2),'Extra':round(extra,2),'Prepayment':round(prepay_now,2),'Interest':round(interest,2),'Principal':round(principal+prepay_now,2),'Remaining Balance':round(balance,2)})
-        if k>100000: break
-    return pd.DataFrame(rows), total_interest
-
 def encode_inputs_to_url(params):
     import urllib.parse
     return urllib.parse.urlencode(params)
 
-def calc_npv(cashflows, rate):
-    return sum([cf/((1+rate)**i) for i,cf in enumerate(cashflows)])
-
-def calc_irr(cashflows):
-    try:
-        r=0.1
-        for _ in range(100):
-            f=sum([cf/((1+r)**i) for i,cf in enumerate(cashflows)])
-            df=sum([-i*cf/((1+r)**(i+1)) for i,cf in enumerate(cashflows)])
-            if df==0: break
-            r_new=r - f/df
-            if abs(r_new-r)<1e-6: return r_new
-            r=r_new
-        return r
-    except:
-        return None
+EXPORT_MIME = {'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
 
 # Layout
 st.title('LoanLab — Advanced Loan Calculator 💸')
@@ -125,29 +80,36 @@ for i in range(num_loans):
 st.header('Comparison & Analysis')
 cols=st.columns([1,1,1])
 for idx, loan in enumerate(loans):
-    df, tot_interest = amort_schedule(loan['principal'], loan['rate'], loan['years'], payments_per_year, extra=loan['extra'], prepay=loan['prepay'], variable_rates=loan['variable_rates'])
+    loan['key']=loan_key(loan['principal'], loan['rate'], loan['years'], payments_per_year, loan['extra'], loan['prepay'], loan['variable_rates'])
+    df, tot_interest = cached_schedule(*loan['key'])
     loan['df']=df; loan['total_interest']=tot_interest; loan['periods']=len(df)
     payment = df['Payment'].iloc[0] if not df.empty else 0.0
-    monthly_equiv = payment * (12/payments_per_year)
+    monthly_equiv = monthly_equivalent(payment, payments_per_year)
     with cols[idx]:
         st.markdown(f"<div class='card'><h4>{loan['name']}</h4><p>Principal: ₹{loan['principal']:,.0f}</p></div>", unsafe_allow_html=True)
         st.metric('Payment per period', f'₹{payment:,.2f}'); st.metric('Est. Monthly Equivalent', f'₹{monthly_equiv:,.2f}'); st.metric('Total Interest', f'₹{tot_interest:,.2f}')
 
 # Balance comparison
 st.markdown('### Balance over time (comparison)')
-plt.figure(figsize=(8,3))
-for loan in loans:
-    if not loan['df'].empty:
-        plt.plot(loan['df']['Payment #'], loan['df']['Remaining Balance'], label=loan['name'])
-plt.xlabel('Payment #'); plt.ylabel('Remaining Balance (₹)'); plt.legend(); st.pyplot(plt.gcf()); plt.clf()
+def render_balance_chart():
+    fig = Figure(figsize=(8,3)); ax = fig.subplots()
+    for loan in loans:
+        if not loan['df'].empty:
+            ax.plot(loan['df']['Payment #'], loan['df']['Remaining Balance'], label=loan['name'])
+    ax.set_xlabel('Payment #'); ax.set_ylabel('Remaining Balance (₹)'); ax.legend()
+    return fig
+st.pyplot(cached_chart(('balance',) + tuple((loan['name'], loan['key']) for loan in loans), render_balance_chart))
 
 # Pie chart for first loan
 st.markdown('### EMI Breakdown — First Loan')
 if loans:
     first=loans[0]; df=first['df']
     if not df.empty:
-        total_principal = df['Principal'].sum(); total_interest = df['Interest'].sum()
-        fig1, ax1 = plt.subplots(); ax1.pie([total_principal, total_interest], labels=['Principal','Interest'], autopct='%1.1f%%', startangle=140); ax1.set_title('EMI: Principal vs Interest'); st.pyplot(fig1)
+        def render_pie_chart():
+            total_principal = df['Principal'].sum(); total_interest = df['Interest'].sum()
+            fig1 = Figure(); ax1 = fig1.subplots(); ax1.pie([total_principal, total_interest], labels=['Principal','Interest'], autopct='%1.1f%%', startangle=140); ax1.set_title('EMI: Principal vs Interest')
+            return fig1
+        st.pyplot(cached_chart(('pie', first['key']), render_pie_chart))
 
 # Progress & milestones for first loan (demonstration)
 st.markdown('### Loan Journey & Progress')
@@ -169,35 +131,52 @@ if loans:
     df=loans[0]['df']
     if not df.empty:
         discount = st.number_input('Discount rate for NPV (%)', min_value=0.0, value=6.0, step=0.1)
-        cashflows = [-loans[0]['principal']] + list(-(df['Payment']+df['Extra']+df['Prepayment']).round(2).astype(float))
-        npv = calc_npv(cashflows, discount/100.0); irr = calc_irr(cashflows)
+        cashflows = schedule_cashflows(loans[0]['principal'], df)
+        npv = calc_npv(cashflows, discount/100.0/payments_per_year); loan_irr = calc_irr(cashflows)
         st.write(f"NPV @ {discount}% = ₹{npv:,.2f}"); 
-        if irr is not None: st.write(f"Approx IRR = {irr*100:.2f}%") 
+        if loan_irr is not None: st.write(f"Approx IRR = {loan_irr*payments_per_year*100:.2f}% (annualized)") 
         else: st.write('IRR could not be computed.')
 
 # Stress test +2%
 st.markdown('### Stress Test: +2% interest')
-for loan in loans:
-    df2, ti2 = amort_schedule(loan['principal'], loan['rate']+2.0, loan['years'], payments_per_year, extra=loan['extra'], prepay=loan['prepay'], variable_rates=loan['variable_rates'])
-    st.write(f"{loan['name']}: total interest now ₹{ti2:,.2f} (was ₹{loan.get('total_interest',0):,.2f})")
+stressed = [cached_schedule(loan['principal'], loan['rate']+2.0, loan['years'], payments_per_year, extra=loan['extra'], prepay=loan['prepay'], variable_rates=loan['variable_rates']) for loan in loans]
+# IRR for every loan, base and stressed, in one batched solve
+series = [schedule_cashflows(l['principal'], l['df']) for l in loans] + [schedule_cashflows(l['principal'], d) for l, (d, _) in zip(loans, stressed)]
+irrs = irr(stack_cashflows(series)).reshape(2, -1) * payments_per_year * 100 if loans else [[], []]
+for loan, (df2, ti2), base_irr, stress_irr in zip(loans, stressed, irrs[0], irrs[1]):
+    st.write(f"{loan['name']}: total interest now ₹{ti2:,.2f} (was ₹{loan.get('total_interest',0):,.2f}); IRR {stress_irr:.2f}% (was {base_irr:.2f}%)")
+
+# Rate x term sensitivity grid
+st.markdown('### Rate & Term Sensitivity')
+if loans:
+    grid_pay, grid_int = rate_term_grid([l['principal'] for l in loans], [l['rate'] for l in loans], payments_per_year)
+    pick = st.selectbox('Loan for heatmap', range(len(loans)), format_func=lambda i: loans[i]['name'])
+    surface = st.radio('Surface', ['Total Interest','Payment'], horizontal=True)
+    grid = grid_int[pick] if surface == 'Total Interest' else grid_pay[pick]
+    def render_heatmap():
+        fig_h = Figure(figsize=(8,4)); ax_h = fig_h.subplots()
+        im = ax_h.imshow(grid, aspect='auto', origin='lower', cmap='viridis', extent=[DEFAULT_TERMS[0]-0.5, DEFAULT_TERMS[-1]+0.5, DEFAULT_RATE_SHOCKS[0]-0.125, DEFAULT_RATE_SHOCKS[-1]+0.125])
+        ax_h.set_xlabel('Term (years)'); ax_h.set_ylabel('Rate shock (%)'); ax_h.set_title(f"{loans[pick]['name']}: {surface} (₹)"); fig_h.colorbar(im, ax=ax_h)
+        return fig_h
+    st.pyplot(cached_chart(('heatmap', surface, loans[pick]['name'], loans[pick]['key']), render_heatmap))
 
 # Risk alerts
 st.markdown('### Risk Alerts')
 for loan in loans:
-    df = loan['df']; payment = df['Payment'].iloc[0] if not df.empty else 0.0; monthly_equiv = payment * (12/payments_per_year)
-    if monthly_equiv > 0.4*income: st.warning(f"{loan['name']}: Estimated monthly equivalent ₹{monthly_equiv:,.0f} is >40% of income — high risk.")
-    elif monthly_equiv > 0.3*income: st.info(f"{loan['name']}: Estimated monthly equivalent ₹{monthly_equiv:,.0f} is >30% of income — caution.")
+    df = loan['df']; payment = df['Payment'].iloc[0] if not df.empty else 0.0; monthly_equiv = monthly_equivalent(payment, payments_per_year)
+    band = risk_band(monthly_equiv, income)
+    if band == 'high': st.warning(f"{loan['name']}: Estimated monthly equivalent ₹{monthly_equiv:,.0f} is >40% of income — high risk.")
+    elif band == 'caution': st.info(f"{loan['name']}: Estimated monthly equivalent ₹{monthly_equiv:,.0f} is >30% of income — caution.")
 
 # Export Excel & PDF
 st.markdown('### Export & Share')
-if st.button('Download Excel (first loan)') and loans:
-    df = loans[0]['df']
-    if not df.empty:
-        buf = io.BytesIO()
-        with pd.ExcelWriter(buf, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Amortization')
-        buf.seek(0)
-        st.download_button('⬇️ Download XLSX', data=buf, file_name='amortization.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+export_fmt = st.selectbox('Schedule export format', ['xlsx','csv','parquet'])
+if st.button('Export schedules (all loans)') and loans:
+    def render_export():
+        buf = io.BytesIO(); export_schedules([(loan['name'], loan['key']) for loan in loans], buf, export_fmt)
+        return buf.getvalue()
+    data = EXPORT_CACHE.get_or_compute((export_fmt,) + tuple((loan['name'], loan['key']) for loan in loans), render_export)
+    st.download_button(f'⬇️ Download {export_fmt.upper()}', data=data, file_name=f'amortization.{export_fmt}', mime=EXPORT_MIME[export_fmt])
 
 if st.button('Download PDF Summary (first loan)') and loans:
     from reportlab.lib.pagesizes import A4
@@ -214,4 +193,7 @@ if st.button('Generate shareable query string'):
         params[f'name{i}']=loan['name']; params[f'price{i}']=loan['price']; params[f'deposit{i}']=loan['deposit']; params[f'rate{i}']=loan['rate']
     q=encode_inputs_to_url(params); st.code(q)
 
+with st.sidebar.expander('Cache stats'):
+    st.write({'schedules': SCHEDULE_CACHE.stats(), 'charts': CHART_CACHE.stats(), 'exports': EXPORT_CACHE.stats()})
+
 st.markdown('\n---\nMade with ❤️ — LoanLab')
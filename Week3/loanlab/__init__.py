@@ -0,0 +1,20 @@
+"""
+LoanLab core: amortization, scenario grids, cash-flow analytics and risk bands,
+importable without Streamlit.
+"""
+
+from .amortization import SCHEDULE_COLUMNS, amort_schedule, iter_schedule, payment_amount
+from .cache import CHART_CACHE, EXPORT_CACHE, SCHEDULE_CACHE, LRUCache, cached_chart, cached_schedule, loan_key
+from .cashflows import calc_irr, calc_npv, irr, npv, schedule_cashflows, stack_cashflows
+from .export import EXPORTERS, export_csv, export_excel, export_parquet, export_schedules
+from .risk import CAUTION_SHARE, HIGH_RISK_SHARE, monthly_equivalent, risk_band
+from .scenarios import DEFAULT_RATE_SHOCKS, DEFAULT_TERMS, level_payment, rate_term_grid
+
+__all__ = [
+    'SCHEDULE_COLUMNS', 'amort_schedule', 'iter_schedule', 'payment_amount',
+    'CHART_CACHE', 'EXPORT_CACHE', 'SCHEDULE_CACHE', 'LRUCache', 'cached_chart', 'cached_schedule', 'loan_key',
+    'calc_irr', 'calc_npv', 'irr', 'npv', 'schedule_cashflows', 'stack_cashflows',
+    'EXPORTERS', 'export_csv', 'export_excel', 'export_parquet', 'export_schedules',
+    'CAUTION_SHARE', 'HIGH_RISK_SHARE', 'monthly_equivalent', 'risk_band',
+    'DEFAULT_RATE_SHOCKS', 'DEFAULT_TERMS', 'level_payment', 'rate_term_grid',
+]
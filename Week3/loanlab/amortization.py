@@ -0,0 +1,126 @@
+"""
+Vectorized amortization engine for LoanLab.
+
+Each period re-amortizes the remaining balance over one year of payments, so
+within a stretch of constant rate and extra payment the balance follows the
+affine recurrence ``B[k+1] = c * B[k] - extra``. That recurrence has a closed
+form, which lets a whole stretch be computed as NumPy arrays at once. Variable
+rate segments and the one-time prepayment only split the loan into a handful
+of such blocks.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+SCHEDULE_COLUMNS = ['Payment #', 'Payment', 'Extra', 'Prepayment', 'Interest', 'Principal', 'Remaining Balance']
+BALANCE_TOL = 1e-6
+MAX_PERIODS = 100001
+
+
+def payment_amount(P, r_annual, n_years, m_payments):
+    n = int(round(n_years * m_payments))
+    if n == 0: return 0.0, 0
+    r = (r_annual/100.0)/m_payments
+    if r == 0: return P/n, n
+    A = P * (r * (1+r)**n) / ((1+r)**n - 1)
+    return A, n
+
+
+def _annuity_factor(r, m_payments):
+    """Payment per unit of balance when amortizing over ``m_payments`` periods."""
+    if r == 0:
+        return 1.0 / m_payments
+    growth = (1 + r) ** m_payments
+    return r * growth / (growth - 1)
+
+
+def _rate_segments(r_annual, variable_rates):
+    """Return ``[(first_period, annual_rate), ...]``; the last rate runs on forever."""
+    segments = []
+    start = 1
+    for periods_count, rate in variable_rates or []:
+        if periods_count > 0:
+            segments.append((start, rate))
+            start += periods_count
+    return segments or [(1, r_annual)]
+
+
+def _block(balance, r, factor, extra, length):
+    """Amortize ``balance`` for up to ``length`` periods at a constant rate.
+
+    Returns the per-period arrays, truncated at the period that pays the loan off.
+    """
+    c = 1 + r - factor
+    if c <= 0:
+        # A single payment clears the whole balance.
+        opening = np.zeros(min(length, 1)) + balance
+    else:
+        fixed = -extra / (1 - c)
+        ratio = (BALANCE_TOL - fixed) / (balance - fixed)
+        if c < 1 and 0 < ratio < 1:
+            # Periods needed to reach the tolerance, plus slack for rounding.
+            length = min(length, int(math.ceil(math.log(ratio) / math.log(c))) + 2)
+        opening = fixed + np.power(c, np.arange(length, dtype=float)) * (balance - fixed)
+    opening = np.maximum(opening, 0.0)
+    payment = opening * factor
+    interest = opening * r
+    principal = np.minimum(opening, payment - interest + extra)
+    closing = np.maximum(0.0, opening - principal)
+    done = np.flatnonzero(closing <= BALANCE_TOL)
+    if done.size:
+        stop = done[0] + 1
+        payment, interest, principal, closing = payment[:stop], interest[:stop], principal[:stop], closing[:stop]
+    return payment, interest, principal, closing
+
+
+def _iter_blocks(P, r_annual, m_payments, extra=0.0, prepay=None, variable_rates=None, block_rows=MAX_PERIODS):
+    """Yield ``(number, payment, prepayment, interest, principal, closing)`` arrays
+    of at most ``block_rows`` periods each, unrounded."""
+    segments = _rate_segments(r_annual, variable_rates)
+    prepay_at = prepay[0] if prepay else None
+    balance = float(P); k = 0
+    while balance > BALANCE_TOL and k < MAX_PERIODS:
+        seg = max(i for i, (first, _) in enumerate(segments) if first <= k + 1)
+        rate = segments[seg][1]
+        end = min(MAX_PERIODS, k + block_rows)
+        if seg + 1 < len(segments):
+            end = min(end, segments[seg + 1][0] - 1)
+        if prepay_at is not None and prepay_at > k:
+            end = min(end, prepay_at)
+        r = (rate/100.0)/m_payments
+        payment, interest, principal, closing = _block(balance, r, _annuity_factor(r, m_payments), extra, end - k)
+        n = len(closing)
+        prepayment = np.zeros(n)
+        if prepay_at is not None and k + n == prepay_at:
+            prepayment[-1] = min(closing[-1], prepay[1])
+            closing[-1] = max(0.0, closing[-1] - prepayment[-1])
+        yield np.arange(k + 1, k + n + 1), payment, prepayment, interest, principal + prepayment, closing
+        balance = float(closing[-1]); k += n
+
+
+def _frame(number, payment, prepayment, interest, principal, closing, extra):
+    return pd.DataFrame({
+        'Payment #': number,
+        'Payment': payment.round(2),
+        'Extra': np.full(len(number), round(extra, 2)),
+        'Prepayment': prepayment.round(2),
+        'Interest': interest.round(2),
+        'Principal': principal.round(2),
+        'Remaining Balance': closing.round(2),
+    }, columns=SCHEDULE_COLUMNS)
+
+
+def iter_schedule(P, r_annual, n_years, m_payments, extra=0.0, prepay=None, variable_rates=None, chunk_rows=10000):
+    """Yield the schedule as DataFrames of at most ``chunk_rows`` rows, without building the whole table."""
+    for block in _iter_blocks(P, r_annual, m_payments, extra, prepay, variable_rates, chunk_rows):
+        yield _frame(*block, extra)
+
+
+def amort_schedule(P, r_annual, n_years, m_payments, extra=0.0, prepay=None, variable_rates=None):
+    parts = list(_iter_blocks(P, r_annual, m_payments, extra, prepay, variable_rates))
+    if not parts:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS), 0.0
+    total_interest = sum(float(interest.sum()) for _, _, _, interest, _, _ in parts)
+    return _frame(*(np.concatenate(col) for col in zip(*parts)), extra), total_interest
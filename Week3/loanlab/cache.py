@@ -0,0 +1,72 @@
+"""
+Bounded LRU caches for LoanLab schedules and charts.
+
+Streamlit re-executes ``app.py`` on every widget change, but imported modules
+stay loaded, so caches held here survive reruns. Schedules are keyed on the
+normalized loan tuple; charts are keyed on the loan keys they plot.
+"""
+
+import threading
+from collections import OrderedDict
+
+from .amortization import amort_schedule
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        # Streamlit sessions run on separate threads and share these caches. ``compute`` runs
+        # outside the lock, so two sessions may build the same value once each; the first stored wins.
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+SCHEDULE_CACHE = LRUCache(256)
+CHART_CACHE = LRUCache(64)
+EXPORT_CACHE = LRUCache(8)
+
+
+def loan_key(P, r_annual, n_years, m_payments, extra=0.0, prepay=None, variable_rates=None):
+    """Hashable ``(principal, rate, years, payments_per_year, extra, prepay, variable_rates)``."""
+    prepay = (int(prepay[0]), float(prepay[1])) if prepay else None
+    variable_rates = tuple((int(p), float(r)) for p, r in variable_rates) if variable_rates else None
+    return (float(P), float(r_annual), float(n_years), int(m_payments), float(extra), prepay, variable_rates)
+
+
+def cached_schedule(P, r_annual, n_years, m_payments, extra=0.0, prepay=None, variable_rates=None):
+    """``amort_schedule`` memoized on the loan key. Callers must not mutate the DataFrame."""
+    key = loan_key(P, r_annual, n_years, m_payments, extra, prepay, variable_rates)
+    return SCHEDULE_CACHE.get_or_compute(key, lambda: amort_schedule(*key))
+
+
+def cached_chart(key, render):
+    """Return the figure built by ``render()`` for ``key``, rendering it only on a miss."""
+    return CHART_CACHE.get_or_compute(key, render)
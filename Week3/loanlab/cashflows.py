@@ -0,0 +1,111 @@
+"""
+Vectorized NPV / IRR analytics for LoanLab.
+
+Cash flows are indexed by period (``cashflows[0]`` is undiscounted). Ragged
+series are zero-padded into a 2-D array, which leaves every NPV unchanged, so
+a whole batch of loans or stress scenarios is solved together.
+"""
+
+import numpy as np
+
+
+def stack_cashflows(series):
+    """Zero-pad a list of cash-flow series into a ``(len(series), longest)`` array."""
+    series = [np.asarray(s, dtype=float) for s in series]
+    out = np.zeros((len(series), max((len(s) for s in series), default=0)))
+    for i, s in enumerate(series):
+        out[i, :len(s)] = s
+    return out
+
+
+def npv(cashflows, rates):
+    """NPV of one series (1-D) or a batch (2-D) at one or many periodic rates.
+
+    The result has shape ``cashflows.shape[:-1] + np.shape(rates)``.
+    """
+    cf = np.asarray(cashflows, dtype=float)
+    r = np.asarray(rates, dtype=float)
+    t = np.arange(cf.shape[-1])
+    discount = np.exp(-np.multiply.outer(np.log1p(r), t))
+    return np.tensordot(cf, discount, axes=([-1], [-1]))
+
+
+def _scaled_npv(cf, t, last, r):
+    """NPV and its derivative for each row at rate ``r[i]``, both scaled by the same
+    positive factor so that no discount factor overflows. Only signs and the Newton
+    ratio are used, and both are scale-invariant. ``last`` is the index of each
+    row's final non-zero flow, where negative rates peak."""
+    log_v = -np.log1p(r)[:, None] * t
+    scale = np.where(r < 0, -np.log1p(r) * last, 0.0)[:, None]
+    disc = np.exp(np.minimum(log_v - scale, 0.0))
+    f = (cf * disc).sum(axis=1)
+    df = -(t * cf * disc).sum(axis=1) / (1 + r)
+    return f, df
+
+
+def irr(cashflows, lo=-0.99, hi=1.0, tol=1e-10, maxiter=200):
+    """Periodic IRR of one series or each row of a batch; NaN where none exists.
+
+    Runs a safeguarded Newton iteration on all rows at once: each row keeps a
+    sign-changing bracket and takes a bisection step whenever the Newton step
+    leaves it or the last step failed to halve it. ``hi`` is widened up to 1e6
+    to find a sign change. Rows still unconverged after ``maxiter`` are NaN.
+    """
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    n = cf.shape[0]
+    t = np.arange(cf.shape[1], dtype=float)
+    last = np.where(cf != 0, t, 0).max(axis=1, initial=0)
+    lo = np.full(n, float(lo)); hi = np.full(n, float(hi))
+    f_lo, _ = _scaled_npv(cf, t, last, lo)
+    f_hi, _ = _scaled_npv(cf, t, last, hi)
+    while True:
+        widen = (np.sign(f_lo) == np.sign(f_hi)) & (hi < 1e6)
+        if not widen.any():
+            break
+        hi[widen] *= 10
+        f_hi[widen], _ = _scaled_npv(cf[widen], t, last[widen], hi[widen])
+    result = np.full(n, np.nan)
+    empty = ~(cf != 0).any(axis=1)
+    result[f_lo == 0] = lo[f_lo == 0]
+    result[f_hi == 0] = hi[f_hi == 0]
+    result[empty] = np.nan
+    active = (np.sign(f_lo) * np.sign(f_hi) < 0)
+    r = (lo + hi) / 2
+    width = hi - lo
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        f, df = _scaled_npv(cf[idx], t, last[idx], r[idx])
+        same = np.sign(f) == np.sign(f_lo[idx])
+        lo[idx[same]] = r[idx[same]]; f_lo[idx[same]] = f[same]
+        hi[idx[~same]] = r[idx[~same]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = r[idx] - f / df
+        # Bisect when Newton leaves the bracket or creeps (the bracket did not halve).
+        new_width = hi[idx] - lo[idx]
+        slow = new_width > width[idx] / 2
+        width[idx] = new_width
+        outside = ~np.isfinite(step) | (step <= lo[idx]) | (step >= hi[idx]) | slow
+        step[outside] = (lo[idx[outside]] + hi[idx[outside]]) / 2
+        done = (np.abs(step - r[idx]) < tol) | (f == 0) | (new_width < tol)
+        r[idx] = step
+        result[idx[done]] = step[done]
+        active[idx[done]] = False
+    result[active] = np.nan
+    return result if np.ndim(cashflows) > 1 else result[0]
+
+
+def schedule_cashflows(principal, df):
+    """Borrower cash flows for a schedule: the principal received, then every outflow."""
+    return [principal] + list(-(df['Payment']+df['Extra']+df['Prepayment']).round(2).astype(float))
+
+
+def calc_npv(cashflows, rate):
+    return float(npv(cashflows, rate))
+
+
+def calc_irr(cashflows):
+    """Scalar IRR, or ``None`` when the cash flows never change sign."""
+    r = irr(cashflows)
+    return None if np.isnan(r) else float(r)
@@ -0,0 +1,155 @@
+"""
+Batch pricing of a loan book from the command line.
+
+    python -m loanlab book.csv -o summary.parquet --workers 8
+
+The book (CSV or Parquet) needs ``rate`` and ``years`` columns plus either
+``principal`` or ``price`` and ``deposit``. Optional columns ``id``, ``extra``,
+``prepay_period``, ``prepay_amount``, ``payments_per_year`` and ``income``
+override the command-line defaults per loan. The book is read in chunks, each
+chunk is priced in a worker process, and results are appended to the output as
+they arrive, so memory is bounded by ``--chunksize`` x ``--workers``.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .amortization import amort_schedule
+from .cashflows import calc_npv, irr, schedule_cashflows, stack_cashflows
+from .risk import monthly_equivalent, risk_band
+
+IRR_BATCH = 1024
+
+
+def read_book(path, chunksize):
+    """Yield the loan book as DataFrames of at most ``chunksize`` rows."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _column(chunk, name, default):
+    if name in chunk:
+        return chunk[name].fillna(default).to_numpy()
+    return np.full(len(chunk), default)
+
+
+def price_chunk(chunk, payments_per_year=12, discount=6.0, income=50000.0, offset=0):
+    """Summary metrics (payment, total interest, NPV, IRR, risk band) for each loan in ``chunk``."""
+    if 'principal' in chunk:
+        principal = chunk['principal'].to_numpy(dtype=float)
+    else:
+        principal = np.maximum(0.0, chunk['price'].to_numpy(dtype=float) - chunk['deposit'].to_numpy(dtype=float))
+    rate = chunk['rate'].to_numpy(dtype=float)
+    years = chunk['years'].to_numpy(dtype=float)
+    extra = _column(chunk, 'extra', 0.0).astype(float)
+    prepay_period = _column(chunk, 'prepay_period', 0).astype(int)
+    prepay_amount = _column(chunk, 'prepay_amount', 0.0).astype(float)
+    m = _column(chunk, 'payments_per_year', payments_per_year).astype(int)
+    income = _column(chunk, 'income', income).astype(float)
+    ids = chunk['id'].to_numpy() if 'id' in chunk else np.arange(offset, offset + len(chunk))
+
+    payment = np.zeros(len(chunk)); total_interest = np.zeros(len(chunk)); npvs = np.zeros(len(chunk))
+    periods = np.zeros(len(chunk), dtype=int); series = []
+    for i in range(len(chunk)):
+        prepay = (prepay_period[i], prepay_amount[i]) if prepay_period[i] > 0 else None
+        df, total_interest[i] = amort_schedule(principal[i], rate[i], years[i], m[i], extra=extra[i], prepay=prepay)
+        periods[i] = len(df)
+        payment[i] = df['Payment'].iloc[0] if not df.empty else 0.0
+        cashflows = schedule_cashflows(principal[i], df)
+        npvs[i] = calc_npv(cashflows, discount/100.0/m[i])
+        series.append(cashflows)
+    irrs = np.concatenate([irr(stack_cashflows(series[s:s + IRR_BATCH])) for s in range(0, len(series), IRR_BATCH)] or [np.zeros(0)])
+    monthly = monthly_equivalent(payment, m)
+    return pd.DataFrame({
+        'id': ids,
+        'principal': principal,
+        'rate': rate,
+        'periods': periods,
+        'payment': payment.round(2),
+        'monthly_equivalent': monthly.round(2),
+        'total_interest': total_interest.round(2),
+        'npv': npvs.round(2),
+        'irr': (irrs * m * 100).round(4),
+        'risk_band': risk_band(monthly, income),
+    })
+
+
+class SummaryWriter:
+    """Append summary chunks to a CSV or Parquet file without holding them in memory."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._rows = 0
+
+    def write(self, frame):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._rows == 0 else 'a', header=self._rows == 0, index=False)
+        self._rows += len(frame)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run(book, output, chunksize=10000, workers=None, payments_per_year=12, discount=6.0, income=50000.0):
+    """Price ``book`` into ``output`` and return the number of loans priced."""
+    workers = workers or os.cpu_count() or 1
+    options = dict(payments_per_year=payments_per_year, discount=discount, income=income)
+    total = 0
+    with SummaryWriter(output) as writer:
+        if workers == 1:
+            for chunk in read_book(book, chunksize):
+                writer.write(price_chunk(chunk, offset=total, **options)); total += len(chunk)
+            return total
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in read_book(book, chunksize):
+                pending.append(pool.submit(price_chunk, chunk, offset=total, **options)); total += len(chunk)
+                # Keep at most two chunks per worker in flight to bound memory.
+                if len(pending) >= 2 * workers:
+                    writer.write(pending.popleft().result())
+            while pending:
+                writer.write(pending.popleft().result())
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loanlab', description='Price a loan book into summary metrics.')
+    parser.add_argument('book', help='loan book (.csv or .parquet)')
+    parser.add_argument('-o', '--output', required=True, help='summary file (.csv or .parquet)')
+    parser.add_argument('--chunksize', type=int, default=10000, help='loans per chunk (default: 10000)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--payments-per-year', type=int, default=12, help='default payments per year (default: 12)')
+    parser.add_argument('--discount', type=float, default=6.0, help='annual NPV discount rate in %% (default: 6.0)')
+    parser.add_argument('--income', type=float, default=50000.0, help='default monthly income for risk bands (default: 50000)')
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    total = run(args.book, args.output, args.chunksize, args.workers, args.payments_per_year, args.discount, args.income)
+    elapsed = time.perf_counter() - start
+    print(f"Priced {total:,} loans in {elapsed:.1f}s ({total/elapsed if elapsed else 0:,.0f} loans/s) -> {args.output}", file=sys.stderr)
+    return 0
@@ -0,0 +1,85 @@
+"""
+Streaming schedule export for LoanLab.
+
+Every exporter pulls schedule chunks from ``iter_schedule`` and writes them out
+before computing the next one, so peak memory depends on ``chunk_rows`` rather
+than on the schedule length. ``loans`` is an iterable of ``(name, key)`` pairs,
+where ``key`` is the tuple returned by ``loan_key``. ``target`` is a path or a
+binary file object.
+"""
+
+import io
+import re
+
+from .amortization import SCHEDULE_COLUMNS, iter_schedule
+
+CHUNK_ROWS = 10000
+
+
+def export_csv(loans, target, chunk_rows=CHUNK_ROWS):
+    """One CSV with a leading ``Loan`` column identifying each loan's rows."""
+    if isinstance(target, str):
+        with open(target, 'wb') as f:
+            return export_csv(loans, f, chunk_rows)
+    text = io.TextIOWrapper(target, encoding='utf-8', newline='')
+    try:
+        text.write(','.join(['Loan'] + SCHEDULE_COLUMNS) + '\n')
+        for name, key in loans:
+            for chunk in iter_schedule(*key, chunk_rows=chunk_rows):
+                chunk.insert(0, 'Loan', name)
+                chunk.to_csv(text, header=False, index=False)
+    finally:
+        text.flush()
+        text.detach()
+
+
+def export_parquet(loans, target, chunk_rows=CHUNK_ROWS):
+    """One Parquet file with a ``Loan`` column; each chunk is written as its own row group."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([('Loan', pa.string()), ('Payment #', pa.int64())] + [(c, pa.float64()) for c in SCHEDULE_COLUMNS[1:]])
+    with pq.ParquetWriter(target, schema) as writer:
+        for name, key in loans:
+            for chunk in iter_schedule(*key, chunk_rows=chunk_rows):
+                chunk.insert(0, 'Loan', name)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _sheet_title(name, used):
+    title = re.sub(r'[\[\]:*?/\\]', '_', str(name))[:31] or 'Loan'
+    base, n = title, 1
+    while title in used:
+        n += 1
+        title = f'{base[:31 - len(str(n)) - 1]}_{n}'
+    used.add(title)
+    return title
+
+
+def export_excel(loans, target, chunk_rows=CHUNK_ROWS):
+    """One worksheet per loan, written with openpyxl's write-only (streaming) workbook."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    used = set()
+    for name, key in loans:
+        ws = wb.create_sheet(_sheet_title(name, used))
+        ws.append(SCHEDULE_COLUMNS)
+        for chunk in iter_schedule(*key, chunk_rows=chunk_rows):
+            for row in chunk.to_numpy().tolist():
+                row[0] = int(row[0])
+                ws.append(row)
+    if not used:
+        wb.create_sheet('Amortization').append(SCHEDULE_COLUMNS)
+    wb.save(target)
+
+
+EXPORTERS = {
+    'csv': export_csv,
+    'parquet': export_parquet,
+    'xlsx': export_excel,
+}
+
+
+def export_schedules(loans, target, fmt, chunk_rows=CHUNK_ROWS):
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unsupported export format {fmt!r}; expected one of {sorted(EXPORTERS)}")
+    EXPORTERS[fmt](loans, target, chunk_rows)
@@ -0,0 +1,24 @@
+"""
+Affordability risk bands used by the LoanLab alerts and the batch CLI.
+"""
+
+import numpy as np
+
+HIGH_RISK_SHARE = 0.4
+CAUTION_SHARE = 0.3
+
+
+def monthly_equivalent(payment, m_payments):
+    return payment * (12/m_payments)
+
+
+def risk_band(monthly_equiv, income):
+    """``'high'`` above 40% of monthly income, ``'caution'`` above 30%, else ``'ok'``.
+
+    Works on scalars or arrays.
+    """
+    monthly_equiv = np.asarray(monthly_equiv, dtype=float)
+    income = np.asarray(income, dtype=float)
+    band = np.where(monthly_equiv > HIGH_RISK_SHARE*income, 'high',
+                    np.where(monthly_equiv > CAUTION_SHARE*income, 'caution', 'ok'))
+    return band.item() if band.ndim == 0 else band
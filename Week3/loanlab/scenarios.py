@@ -0,0 +1,41 @@
+"""
+Batched rate-shock x term sensitivity grids for LoanLab.
+
+The amortization schedule re-amortizes the balance every period, so its length
+does not depend on the term. The grid therefore prices the contractual
+level payment from ``payment_amount`` for every (loan, rate shock, term)
+combination at once, using NumPy broadcasting over a 3-D array.
+"""
+
+import numpy as np
+
+DEFAULT_RATE_SHOCKS = np.round(np.arange(-3.0, 5.0 + 1e-9, 0.25), 2)
+DEFAULT_TERMS = np.arange(5, 31)
+
+
+def level_payment(P, r_annual, n_years, m_payments):
+    """Vectorized ``payment_amount``: broadcasts over all array arguments."""
+    P = np.asarray(P, dtype=float)
+    n = np.rint(np.asarray(n_years, dtype=float) * m_payments)
+    r = np.asarray(r_annual, dtype=float) / 100.0 / m_payments
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.power(1 + r, n)
+        annuity = P * r * growth / (growth - 1)
+        flat = P / n
+    payment = np.where(r == 0, flat, annuity)
+    payment = np.where(n == 0, 0.0, payment)
+    return payment, n
+
+
+def rate_term_grid(principals, rates, m_payments, rate_shocks=DEFAULT_RATE_SHOCKS, terms=DEFAULT_TERMS):
+    """Payment and total interest surfaces for every loan.
+
+    Returns two arrays of shape ``(loans, len(rate_shocks), len(terms))``.
+    Shocked rates are floored at zero.
+    """
+    P = np.asarray(principals, dtype=float)[:, None, None]
+    shocked = np.maximum(np.asarray(rates, dtype=float)[:, None, None] + np.asarray(rate_shocks, dtype=float)[None, :, None], 0.0)
+    years = np.asarray(terms, dtype=float)[None, None, :]
+    payment, n = level_payment(P, shocked, years, m_payments)
+    total_interest = np.where(n == 0, 0.0, payment * n - P)
+    return payment, total_interest
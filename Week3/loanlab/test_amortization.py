@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from loanlab.amortization import SCHEDULE_COLUMNS, amort_schedule, iter_schedule, payment_amount
+
+
+def reference_schedule(P, r_annual, n_years, m_payments, extra=0.0, prepay=None, variable_rates=None):
+    """The original row-by-row loop that amort_schedule replaced."""
+    rows=[]; balance=P; k=0; total_interest=0.0
+    rates = None
+    if variable_rates:
+        rates=[]
+        for periods_count, rate in variable_rates:
+            rates += [rate]*periods_count
+    max_iter=200000
+    while balance>1e-6 and k<max_iter:
+        k+=1
+        if rates:
+            r_annual = rates[k-1] if k-1<len(rates) else rates[-1]
+        r = (r_annual/100.0)/m_payments
+        A, _ = payment_amount(balance, r_annual, 1.0, m_payments)
+        interest = balance * r
+        principal = min(balance, A - interest + extra)
+        balance = max(0.0, balance - principal)
+        prepay_now=0.0
+        if prepay and k==prepay[0]:
+            prepay_now = min(balance, prepay[1]); balance = max(0.0, balance - prepay_now)
+        total_interest += interest
+        rows.append({'Payment #':k,'Payment':round(A,2),'Extra':round(extra,2),'Prepayment':round(prepay_now,2),'Interest':round(interest,2),'Principal':round(principal+prepay_now,2),'Remaining Balance':round(balance,2)})
+        if k>100000: break
+    return pd.DataFrame(rows), total_interest
+
+
+def assert_same_schedule(loan):
+    expected, expected_interest = reference_schedule(*loan)
+    got, interest = amort_schedule(*loan)
+    assert list(got.columns) == SCHEDULE_COLUMNS
+    assert len(got) == len(expected)
+    if len(expected):
+        assert (got['Payment #'].to_numpy() == expected['Payment #'].to_numpy()).all()
+        # Within cent rounding: the closed form and the loop differ only in the last float bits.
+        np.testing.assert_allclose(got[SCHEDULE_COLUMNS[1:]].to_numpy(float),
+                                   expected[SCHEDULE_COLUMNS[1:]].to_numpy(float), atol=0.0101)
+    assert interest == pytest.approx(expected_interest, rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("loan", [
+    (250000, 6.5, 30, 12),
+    (250000, 6.5, 30, 12, 200.0),
+    (250000, 6.5, 30, 12, 0.0, (60, 50000.0)),
+    (250000, 6.5, 30, 12, 150.0, (24, 1e9)),
+    (100000, 0.0, 10, 12),
+    (100000, 5.0, 15, 26, 25.0),
+    (300000, 4.0, 30, 12, 0.0, None, [(60, 3.0), (60, 5.5), (0, 9.0), (120, 7.25)]),
+    (300000, 4.0, 30, 12, 100.0, (90, 20000.0), [(36, 2.0), (48, 0.0), (12, 12.0)]),
+    (0, 5.0, 30, 12),
+    (0, 5.0, 30, 12, 100.0, (12, 500.0), [(12, 3.0)]),
+])
+def test_matches_reference_loop(loan):
+    assert_same_schedule(loan)
+
+
+def test_matches_reference_loop_randomized():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        P = float(rng.choice([0, rng.uniform(1000, 1e6)], p=[0.05, 0.95]))
+        rate = float(rng.choice([0.0, rng.uniform(0.5, 15)], p=[0.1, 0.9]))
+        m = int(rng.choice([4, 12, 26, 52]))
+        extra = float(rng.choice([0.0, rng.uniform(1, 500)]))
+        prepay = (int(rng.integers(1, 400)), float(rng.uniform(100, 2e5))) if rng.random() < 0.4 else None
+        variable = None
+        if rng.random() < 0.4:
+            variable = [(int(rng.integers(0, 120)), float(rng.uniform(0, 15))) for _ in range(int(rng.integers(1, 5)))]
+        assert_same_schedule((P, rate, 30, m, extra, prepay, variable))
+
+
+def test_iter_schedule_concatenates_to_full_schedule():
+    loan = (300000, 4.0, 30, 12, 100.0, (90, 20000.0), [(36, 2.0), (48, 5.0)])
+    full, _ = amort_schedule(*loan)
+    chunks = list(iter_schedule(*loan, chunk_rows=50))
+    assert max(len(c) for c in chunks) <= 50
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
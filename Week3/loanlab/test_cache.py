@@ -0,0 +1,43 @@
+import sys
+import threading
+
+from loanlab.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: 0)          # hit: 'a' becomes most recent
+    cache.get_or_compute('c', lambda: 3)          # evicts 'b'
+    assert cache.get_or_compute('a', lambda: 0) == 1
+    assert cache.get_or_compute('b', lambda: 22) == 22
+    assert cache.stats()['size'] == 2
+
+
+def test_concurrent_access_stays_bounded():
+    cache = LRUCache(8)
+    errors = []
+
+    def work(seed):
+        try:
+            for i in range(5000):
+                key = (i * 7 + seed) % 32
+                assert cache.get_or_compute(key, lambda: key * 2) == key * 2
+        except Exception as exc:
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    stats = cache.stats()
+    assert stats['size'] <= 8
+    assert stats['hits'] + stats['misses'] == 8 * 5000
@@ -0,0 +1,41 @@
+import numpy as np
+
+from loanlab.cashflows import irr, npv, stack_cashflows
+
+
+def annuity(rate, n, principal=1000.0):
+    """Borrower flows of an ``n``-period loan (principal, then n-1 level payments) at ``rate``."""
+    v = (1 + rate) ** -np.arange(1, n)
+    return np.r_[principal, -np.full(n - 1, principal / v.sum())]
+
+
+def test_irr_recovers_annuity_rate():
+    assert abs(irr(annuity(0.005, 360)) - 0.005) < 1e-9
+    assert abs(irr([-100, 50, 60]) - 0.0639410298) < 1e-9
+
+
+def test_irr_without_sign_change_is_nan():
+    assert np.isnan(irr([100, 10]))
+    assert np.isnan(irr([0, 0]))
+
+
+def test_irr_long_negative_rate_series():
+    # Newton used to creep on these until maxiter and return the unconverged guess.
+    assert abs(irr(annuity(-0.0916, 376)) - (-0.0916)) < 1e-9
+
+    rng = np.random.default_rng(0)
+    rates = rng.uniform(-0.3, -0.001, 500)
+    series = [annuity(r, int(n)) for r, n in zip(rates, rng.integers(2, 600, 500))]
+    got = irr(stack_cashflows(series))
+    assert np.abs(got - rates).max() < 1e-6
+
+
+def test_irr_batch_matches_rows():
+    series = [annuity(0.01, 12), annuity(0.2, 40), annuity(-0.05, 100)]
+    batch = irr(stack_cashflows(series))
+    assert np.allclose(batch, [irr(s) for s in series])
+
+
+def test_npv_at_irr_is_zero():
+    cf = annuity(0.02, 60)
+    assert abs(npv(cf, irr(cf))) < 1e-4
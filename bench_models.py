@@ -0,0 +1,188 @@
+# bench_models.py
+# Compare the model_registry backends (fp32, int8, onnx) for one or more pipeline tasks:
+#
+#   first   seconds to a usable pipeline in a fresh process with an empty artifact cache
+#           (download/deserialize + quantize or export)
+#   cold    the same in a fresh process once the converted model is cached on disk
+#   warm    a repeat get_pipeline() call in the same process (the registry hit)
+#   latency per-call p50/p90 over the benchmark inputs, after one warm-up call
+#   parity  agreement with the fp32 outputs: identical generated text, or same label and the
+#           largest score difference for classification
+#
+# Every load runs in its own subprocess so import and deserialization costs are real.
+#
+# Usage: python bench_models.py --task sentiment-analysis --task summarization
+#        python bench_models.py --task text-generation --model gpt2 --backends fp32,int8 --json
+
+import time
+
+STARTED = time.perf_counter()   # before the heavy imports, so "cold" includes importing torch
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_MODELS = {
+    "text-generation": "gpt2",
+    "text2text-generation": "google/flan-t5-large",
+    "summarization": "sshleifer/distilbart-cnn-12-6",
+    "sentiment-analysis": "distilbert-base-uncased-finetuned-sst-2-english",
+}
+
+INPUTS = {
+    "text-generation": [
+        "Write a small poem about the ocean",
+        "Explain how rainbows are formed",
+        "The best way to learn a new language is",
+        "Once upon a time in a small village,",
+    ],
+    "text2text-generation": [
+        "Determine if the following sentence is Positive or Negative: 'The movie was wonderful.'",
+        "Explain photosynthesis step by step, reasoning each step clearly.",
+        "Translate English to German: How old are you?",
+        "Answer the question: what is the capital of France?",
+    ],
+    "summarization": [
+        "Photosynthesis is the process by which green plants use sunlight to synthesize food from "
+        "carbon dioxide and water. It involves the green pigment chlorophyll and generates oxygen as a byproduct.",
+        "The city council approved a new budget on Tuesday that increases spending on public transport "
+        "and parks, while cutting administrative costs. The mayor said the plan would make the city greener "
+        "and more affordable, though critics argued the cuts would slow down permit processing.",
+        "Researchers have developed a battery that charges in five minutes and keeps most of its capacity "
+        "after thousands of cycles. The team hopes the design will be used in electric cars within a decade.",
+    ],
+    "sentiment-analysis": [
+        "I love using Hugging Face models!",
+        "The service was slow and the food was cold.",
+        "It was fine, nothing special.",
+        "Absolutely fantastic experience, would recommend to everyone.",
+    ],
+}
+INPUTS["text-classification"] = INPUTS["sentiment-analysis"]
+CLASSIFICATION = {"sentiment-analysis", "text-classification"}
+
+GENERATION = {"do_sample": False, "max_new_tokens": 32}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def run_child(args):
+    """Load one backend, time it and run the inputs; prints one JSON object."""
+    from model_registry import get_pipeline
+
+    load_start = time.perf_counter()
+    pipe = get_pipeline(args.task, args.model, args.backend)
+    loaded = time.perf_counter()
+    get_pipeline(args.task, args.model, args.backend)
+    warm = time.perf_counter() - loaded
+
+    kwargs = {} if args.task in CLASSIFICATION else GENERATION
+    inputs = INPUTS[args.task]
+    import torch
+
+    with torch.inference_mode():
+        pipe(inputs[0], **kwargs)
+        latencies, outputs = [], []
+        for _ in range(args.repeats):
+            for text in inputs:
+                start = time.perf_counter()
+                out = pipe(text, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                if len(outputs) < len(inputs):
+                    outputs.append(out[0])
+    print(json.dumps({
+        "startup_s": loaded - STARTED,
+        "load_s": loaded - load_start,
+        "warm_s": warm,
+        "latencies": latencies,
+        "outputs": outputs,
+    }))
+
+
+def spawn(task, model, backend, repeats, cache_dir):
+    env = dict(os.environ, MODEL_CACHE_DIR=cache_dir, TOKENIZERS_PARALLELISM="false")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--task", task, "--model", model,
+           "--backend", backend, "--repeats", str(repeats)]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"{backend} benchmark failed:\n{proc.stderr.strip()[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def parity(outputs, reference):
+    if "label" in reference[0]:   # classification
+        same = sum(o["label"] == r["label"] for o, r in zip(outputs, reference))
+        diff = max(abs(o["score"] - r["score"]) for o, r in zip(outputs, reference))
+        return {"match": same / len(reference), "max_score_diff": round(diff, 4)}
+    key = next(iter(reference[0]))
+    same = sum(o[key] == r[key] for o, r in zip(outputs, reference))
+    return {"match": same / len(reference)}
+
+
+def bench(task, model, backends, repeats):
+    rows = []
+    reference = None
+    with tempfile.TemporaryDirectory(prefix="model_registry_") as cache_dir:
+        for backend in backends:
+            first = spawn(task, model, backend, repeats, cache_dir)
+            cold = spawn(task, model, backend, repeats, cache_dir)
+            lat = [s * 1000 for s in cold["latencies"]]
+            if backend == "fp32":
+                reference = cold["outputs"]
+            rows.append({
+                "task": task,
+                "model": model,
+                "backend": backend,
+                "first_s": round(first["startup_s"], 2),
+                "cold_s": round(cold["startup_s"], 2),
+                "warm_ms": round(cold["warm_s"] * 1000, 3),
+                "p50_ms": round(percentile(lat, 50), 1),
+                "p90_ms": round(percentile(lat, 90), 1),
+                **(parity(cold["outputs"], reference) if reference else {}),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold/warm start, latency and fp32 parity of the model backends.")
+    parser.add_argument("--task", action="append", choices=sorted(INPUTS), help="repeatable (default: all)")
+    parser.add_argument("--model", help="model id or path (default: the course model for each task)")
+    parser.add_argument("--backends", default="fp32,int8,onnx", help="comma-separated, fp32 first (default: all)")
+    parser.add_argument("--repeats", type=int, default=3, help="passes over the inputs (default: 3)")
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.task = args.task[0]
+        run_child(args)
+        return
+
+    backends = args.backends.split(",")
+    if "fp32" in backends:
+        backends = ["fp32"] + [b for b in backends if b != "fp32"]
+    rows = []
+    for task in args.task or list(DEFAULT_MODELS):
+        model = args.model or DEFAULT_MODELS[task]
+        for row in bench(task, model, backends, args.repeats):
+            rows.append(row)
+            if not args.json:
+                extra = f"  match {row['match']:.0%}" if "match" in row else ""
+                if "max_score_diff" in row:
+                    extra += f" (max score diff {row['max_score_diff']})"
+                print(f"{task:<21} {row['backend']:<5} first {row['first_s']:6.2f}s  cold {row['cold_s']:6.2f}s  "
+                      f"warm {row['warm_ms']:7.3f}ms  p50 {row['p50_ms']:8.1f}ms  p90 {row['p90_ms']:8.1f}ms{extra}",
+                      flush=True)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
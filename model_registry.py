@@ -0,0 +1,156 @@
+# model_registry.py
+# Shared Hugging Face pipeline registry for the course scripts. get_pipeline() loads each
+# (task, model, backend) once per process and hands the same pipeline to every later caller, and
+# can swap the published fp32 PyTorch weights for a CPU-optimized model:
+#
+#   fp32  the model as published (default)
+#   int8  torch dynamic quantization: every Linear layer (GPT-2's Conv1D included) stores int8
+#         weights and quantizes activations on the fly
+#   onnx  ONNX Runtime export through optimum (pip install "optimum[onnxruntime]")
+#
+# Converted models are cached on disk under $MODEL_CACHE_DIR (default ~/.cache/model_registry),
+# so only the first run pays for quantization or export. Choose the backend per run with
+# MODEL_BACKEND=int8 python compare.py, or get_pipeline(..., backend="onnx") in code.
+# bench_models.py compares cold start, warm start, latency and output parity of the backends.
+#
+# Scripts in the WeekN/DayN folders import it from the repository root:
+#   sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+#   from model_registry import get_pipeline
+
+import os
+import re
+import shutil
+import threading
+import time
+import warnings
+from pathlib import Path
+
+import torch
+import transformers
+from transformers import AutoTokenizer, pipeline
+
+BACKENDS = ("fp32", "int8", "onnx")
+CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", Path.home() / ".cache" / "model_registry"))
+
+# Model class per supported pipeline task: (transformers auto class, optimum ONNX Runtime class).
+TASK_CLASSES = {
+    "text-generation": ("AutoModelForCausalLM", "ORTModelForCausalLM"),
+    "text2text-generation": ("AutoModelForSeq2SeqLM", "ORTModelForSeq2SeqLM"),
+    "summarization": ("AutoModelForSeq2SeqLM", "ORTModelForSeq2SeqLM"),
+    "sentiment-analysis": ("AutoModelForSequenceClassification", "ORTModelForSequenceClassification"),
+    "text-classification": ("AutoModelForSequenceClassification", "ORTModelForSequenceClassification"),
+}
+
+_pipelines = {}
+_lock = threading.Lock()
+load_seconds = {}   # registry key -> seconds the first get_pipeline() call took
+
+
+def default_backend():
+    return os.getenv("MODEL_BACKEND", "fp32")
+
+
+def artifact_dir(task, model, backend, cache_dir=None):
+    """Where the converted ``model`` is cached (one directory per backend, model and model class)."""
+    slug = re.sub(r"[^\w.-]+", "--", model.strip("/\\"))
+    return Path(cache_dir or CACHE_DIR) / backend / slug / TASK_CLASSES[task][0]
+
+
+def _conv1d_to_linear(module):
+    """GPT-2 style models use transformers' Conv1D (a Linear with transposed weights), which
+    quantize_dynamic does not recognise; replace each one with the equivalent nn.Linear."""
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            n_in, n_out = child.weight.shape
+            linear = torch.nn.Linear(n_in, n_out)
+            linear.weight = torch.nn.Parameter(child.weight.detach().t().contiguous())
+            linear.bias = child.bias
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
+def _save(obj_writer, target):
+    """Write an artifact next to ``target`` and move it into place, so an interrupted conversion
+    never leaves a half-written cache entry behind."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    try:
+        obj_writer(tmp)
+        if target.is_dir():
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    finally:
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+        elif tmp.exists():
+            tmp.unlink()
+
+
+def _load_int8(task, model, path, refresh):
+    # The whole quantized module is pickled, so a cached load skips both the fp32 weights and the
+    # conversion. The file name carries the torch version: quantized pickles do not travel across it.
+    target = path / f"model-torch{torch.__version__.split('+')[0]}.pt"
+    if target.exists() and not refresh:
+        return torch.load(target, weights_only=False)   # written by this module, see below
+    module = getattr(transformers, TASK_CLASSES[task][0]).from_pretrained(model)
+    module.eval()
+    _conv1d_to_linear(module)
+    with warnings.catch_warnings():
+        # Eager-mode quantization is marked deprecated in favour of torchao, but still works.
+        warnings.simplefilter("ignore")
+        quantized = torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+    _save(lambda tmp: torch.save(quantized, tmp), target)
+    return quantized
+
+
+def _load_onnx(task, model, path, refresh):
+    try:
+        import optimum.onnxruntime as ort
+    except ImportError as exc:
+        raise ImportError('backend="onnx" needs optimum: pip install "optimum[onnxruntime]"') from exc
+    model_class = getattr(ort, TASK_CLASSES[task][1])
+    target = path / "onnx"
+    if (target / "config.json").exists() and not refresh:
+        return model_class.from_pretrained(target)
+    exported = model_class.from_pretrained(model, export=True)
+    _save(exported.save_pretrained, target)
+    return exported
+
+
+def get_pipeline(task, model, backend=None, device=-1, refresh=False, cache_dir=None):
+    """The process-wide pipeline for ``task`` and ``model`` on ``backend`` (default: $MODEL_BACKEND
+    or fp32). The first call loads it, converting and caching the model for int8/onnx; later
+    calls return the same object. ``refresh`` rebuilds the on-disk artifact."""
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend != "fp32":
+        if task not in TASK_CLASSES:
+            raise ValueError(f"backend {backend!r} supports the tasks {', '.join(TASK_CLASSES)}, not {task!r}")
+        if device not in (-1, "cpu"):
+            raise ValueError(f"backend {backend!r} runs on the CPU only (device=-1)")
+
+    key = (task, model, backend, device)
+    with _lock:
+        if key in _pipelines and not refresh:
+            return _pipelines[key]
+        start = time.perf_counter()
+        if backend == "fp32":
+            pipe = pipeline(task, model=model, device=device)
+        else:
+            load = _load_int8 if backend == "int8" else _load_onnx
+            module = load(task, model, artifact_dir(task, model, backend, cache_dir), refresh)
+            pipe = pipeline(task, model=module, tokenizer=AutoTokenizer.from_pretrained(model))
+        _pipelines[key] = pipe
+        load_seconds[key] = time.perf_counter() - start
+        return pipe
+
+
+def clear():
+    """Forget every loaded pipeline (the on-disk artifacts stay)."""
+    with _lock:
+        _pipelines.clear()
+        load_seconds.clear()